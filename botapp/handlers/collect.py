@@ -184,6 +184,7 @@ async def _set_last_id_to_latest_for_all_channels() -> None:
                     log.info(f"[reset07] {ch} last_id -> {m[0].id}")
             except Exception as e:
                 log.warning(f"[reset07] fallo obteniendo último id de {ch}: {e}")
+    STATE.flush()
 
 
 async def _ensure_today_files_with_meteo() -> None:
@@ -324,6 +325,7 @@ async def _collect_job(context: ContextTypes.DEFAULT_TYPE) -> None:
                         )
                     except Exception:
                         pass
+                STATE.flush()
                 return  # salir del job en este tick
             except Exception as e:
                 log.exception(f"[collect] Error en {ch}: {e}")
@@ -337,6 +339,8 @@ async def _collect_job(context: ContextTypes.DEFAULT_TYPE) -> None:
                         pass
                 # continuar con el siguiente canal
 
+    STATE.flush()  # una sola escritura del estado por barrido
+
     # ===== 2) BLOQUE WEB/HTTPS (BEST-EFFORT, AISLADO) =====
     try:
         now_utc = datetime.now(timezone.utc)
@@ -39,6 +39,10 @@ async def flights_addroutes_bootstrap() -> None:
     if changed:
         _save_routes(routes)
 
+async def flights_shutdown() -> None:
+    """Cierra la sesión HTTP compartida de FLIGHTS (se llama en el apagado del bot)."""
+    await FLIGHTS.close()
+
 async def route_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     /route_add <alias> <origen> <destino>
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import asyncio
+from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes
 from botapp.services.map_builder import build_incidents_map
@@ -31,9 +33,10 @@ async def map_incidentes(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         await update.message.reply_text("⏳ Generando mapa de incidentes… (esto puede llevar unos segundos)")
-        outpath = build_incidents_map(pais=pais, days=days, resolve_missing=True)
-        with open(outpath, "rb") as f:
-            await context.bot.send_document(chat_id=update.effective_chat.id, document=f, filename=outpath.split("/")[-1],
-                                            caption=f"Mapa de incidentes ({pais or 'todos'}) últimos {days} días.")
+        # Render y lectura en hilo: el bot sigue atendiendo otros comandos mientras tanto
+        outpath = await asyncio.to_thread(build_incidents_map, pais=pais, days=days, resolve_missing=True)
+        data = await asyncio.to_thread(Path(outpath).read_bytes)
+        await context.bot.send_document(chat_id=update.effective_chat.id, document=data, filename=Path(outpath).name,
+                                        caption=f"Mapa de incidentes ({pais or 'todos'}) últimos {days} días.")
     except Exception as e:
         await update.message.reply_text(f"❗ No se pudo generar el mapa. {e}\n{HELP_TXT}")
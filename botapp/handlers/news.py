@@ -1,5 +1,6 @@
 from __future__ import annotations
 import re
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 import aiohttp
@@ -19,10 +20,33 @@ STORE = Store(SET.data_dir)
 MAX_BYTES = 2 * 1024 * 1024          # 2 MB por página
 TIMEOUT_S = 30
 UA = "Mozilla/5.0 (compatible; MIBOT3/1.0; +https://example.local)"
+ETAG_CACHE_MAX = 1024
+
+# (país, url) -> (ETag, Last-Modified) de la última página cuyos titulares se guardaron (LRU acotado)
+_ETAGS: "OrderedDict[tuple[str, str], tuple[str, str]]" = OrderedDict()
+
+# Resultado de fetch_and_store_news cuando la página no ha cambiado (304)
+NOT_MODIFIED = object()
+
+def _cache_key(country: str, url: str) -> tuple[str, str]:
+    try:
+        p = urlparse(url)
+        u = f"{p.netloc.lower()}{p.path or '/'}?{p.query}"
+    except Exception:
+        u = url
+    return (country.lower().strip(), u)
+
+def _remember_validators(key: tuple[str, str], etag: str, last_mod: str) -> None:
+    if not etag and not last_mod:
+        _ETAGS.pop(key, None)
+        return
+    _ETAGS[key] = (etag, last_mod)
+    _ETAGS.move_to_end(key)
+    while len(_ETAGS) > ETAG_CACHE_MAX:
+        _ETAGS.popitem(last=False)
 
 def _clean_text(s: str) -> str:
-    s = re.sub(r"\s+", " ", s or "").strip()
-    return s
+    return " ".join((s or "").split())
 
 def _domain(url: str) -> str:
     try:
@@ -30,19 +54,39 @@ def _domain(url: str) -> str:
     except Exception:
         return "web"
 
-async def _fetch_html(url: str) -> str:
-    """Descarga la página con límite de tamaño y timeout."""
+async def _fetch_html(key: tuple[str, str], url: str) -> tuple[str | None, tuple[str, str]]:
+    """
+    Descarga la página con límite de tamaño y timeout.
+    Usa GET condicional (ETag / Last-Modified): devuelve (None, ...) si la página no ha cambiado (304).
+    Los validadores de la respuesta se devuelven sin guardar: el llamador los recuerda
+    solo cuando los titulares ya están almacenados.
+    """
+    headers = {}
+    cached = _ETAGS.get(key)
+    if cached:
+        etag, last_mod = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_mod:
+            headers["If-Modified-Since"] = last_mod
+
     async with aiohttp.ClientSession(headers={"User-Agent": UA}) as session:
-        async with session.get(url, timeout=TIMEOUT_S) as r:
+        async with session.get(url, timeout=TIMEOUT_S, headers=headers) as r:
+            if r.status == 304:
+                if key in _ETAGS:
+                    _ETAGS.move_to_end(key)
+                return None, cached or ("", "")
             r.raise_for_status()
-            total = 0
-            chunks = []
-            async for chunk in r.content.iter_chunked(16384):
-                total += len(chunk)
-                if total > MAX_BYTES:
+            validators = (r.headers.get("ETag", ""), r.headers.get("Last-Modified", ""))
+            # Un único buffer contiguo (sin lista de trozos + join)
+            buf = bytearray()
+            async for chunk in r.content.iter_chunked(65536):
+                room = MAX_BYTES - len(buf)
+                if len(chunk) > room:
+                    buf.extend(memoryview(chunk)[:room])
                     break
-                chunks.append(chunk)
-            return b"".join(chunks).decode(r.charset or "utf-8", errors="replace")
+                buf.extend(chunk)
+            return buf.decode(r.charset or "utf-8", errors="replace"), validators
 
 def _extract_headlines(html: str) -> list[str]:
     soup = make_soup(html)
@@ -79,13 +123,17 @@ def _extract_headlines(html: str) -> list[str]:
 async def fetch_and_store_news(country: str, url: str):
     """
     Descarga titulares de la URL y los guarda en el TXT del país (día operativo).
-    Devuelve la ruta del TXT (Path) o None si no se añadieron titulares.
+    Devuelve la ruta del TXT (Path), NOT_MODIFIED si la página no ha cambiado desde
+    la última vez que se guardaron sus titulares para ese país, o None si no se añadió nada.
     """
     if not re.match(r"^https?://", url.strip()):
         return None
 
     try:
-        html = await _fetch_html(url)
+        key = _cache_key(country, url)
+        html, validators = await _fetch_html(key, url)
+        if html is None:  # 304: sin cambios desde el último guardado
+            return NOT_MODIFIED
         headlines = _extract_headlines(html)
         if not headlines:
             return None
@@ -102,6 +150,7 @@ async def fetch_and_store_news(country: str, url: str):
             dt=dt_str(SET.tz),
             text=f"{url}\n\n{body}",
         )
+        _remember_validators(key, *validators)
         return fpath
     except Exception:
         return None
@@ -120,6 +169,10 @@ async def news(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     try:
         fpath = await fetch_and_store_news(country, url)
+        if fpath is NOT_MODIFIED:
+            return await update.message.reply_text(
+                f"ℹ️ Sin cambios en {_domain(url)} desde la última descarga; no se añadió nada."
+            )
         if not fpath:
             return await update.message.reply_text("No encontré titulares útiles en la página o URL inválida.")
         await update.message.reply_text(
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 from telegram import Update, InputFile
 from telegram.ext import ContextTypes
 from io import BytesIO
 from zipfile import ZipFile, ZIP_DEFLATED
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import re  # 👈 para detectar eventos y bullets
 
@@ -44,6 +45,15 @@ def _to_en(text: str) -> str:
         print(f"[report_dia] aviso: fallo traduciendo a inglés: {e!r}")
         return text
 
+async def _to_en_async(text: str) -> str:
+    """
+    Igual que _to_en, pero ejecutado en un hilo para no bloquear el event loop
+    mientras el traductor procesa TXT largos.
+    """
+    if not text or translate_to_en is None:
+        return text or ""
+    return await asyncio.to_thread(_to_en, text)
+
 def _clean_txt_structure(text: str) -> str:
     """
     Limpia y hace más legible el TXT:
@@ -82,6 +92,28 @@ def _clean_txt_structure(text: str) -> str:
     cleaned = "\n".join(out).strip() + "\n"
     return cleaned
 
+# Nº de op-days por tipo de periodo (el mes se calcula aparte)
+_PERIOD_DAYS = {"semana": 7, "quincena": 15}
+
+def _range_for(kind: str, arg: str | None = None) -> list[str]:
+    """
+    Lista de op-days (YYYY-MM-DD) para un periodo:
+      - semana/quincena: desde arg (YYYY-MM-DD) o, sin arg, terminando hoy.
+      - mes: todos los días del mes arg (YYYY-MM).
+    Lanza ValueError si la fecha no es válida.
+    strptime (y no date.fromisoformat) para seguir aceptando meses/días sin cero, p.ej. "2025-9".
+    """
+    if kind == "mes":
+        first = datetime.strptime(f"{arg}-01", "%Y-%m-%d").date()
+        last = date(first.year + first.month // 12, first.month % 12 + 1, 1) - timedelta(days=1)
+        return opday_list(SET.tz, first.isoformat(), last.isoformat())
+
+    n = _PERIOD_DAYS[kind]
+    if arg:
+        start = datetime.strptime(arg, "%Y-%m-%d").date()
+        return opday_list(SET.tz, start.isoformat(), (start + timedelta(days=n - 1)).isoformat())
+    return list(reversed(last_n_opdays(SET.tz, n)))
+
 async def _send_txt(update: Update, name: str, content: str, caption: str):
     buf = BytesIO()
     buf.write(content.encode("utf-8"))
@@ -142,7 +174,7 @@ async def report_dia(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     final_text = _clean_txt_structure(final_text)
 
     # 2.2) Traducir TODO el texto del informe al inglés (si hay traductor)
-    final_text_en = _to_en(final_text)
+    final_text_en = await _to_en_async(final_text)
 
     # 3) Construir y enviar archivo final (en inglés)
     name = f"{country}-{day}_opday.txt"
@@ -164,11 +196,8 @@ async def report_semana(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         return await update.message.reply_text("Uso: /reportsemana <pais> [YYYY-MM-DD_inicio]")
     country = context.args[0].lower().strip()
 
-    if len(context.args) >= 2:
-        start_str = context.args[1].strip()
-        days = opday_list(SET.tz, start_str, (datetime.strptime(start_str, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d"))
-    else:
-        days = list(reversed(last_n_opdays(SET.tz, 7)))  # 7 días terminando hoy
+    start_str = context.args[1].strip() if len(context.args) >= 2 else None
+    days = _range_for("semana", start_str)  # sin inicio: 7 días terminando hoy
 
     chunks = []
     for d in days:
@@ -194,12 +223,8 @@ async def report_quincena(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return await update.message.reply_text("Uso: /reportquincena <pais> [YYYY-MM-DD_inicio]")
     country = context.args[0].lower().strip()
 
-    n = 15
-    if len(context.args) >= 2:
-        start_str = context.args[1].strip()
-        days = opday_list(SET.tz, start_str, (datetime.strptime(start_str, "%Y-%m-%d") + timedelta(days=n-1)).strftime("%Y-%m-%d"))
-    else:
-        days = list(reversed(last_n_opdays(SET.tz, n)))
+    start_str = context.args[1].strip() if len(context.args) >= 2 else None
+    days = _range_for("quincena", start_str)
 
     chunks = []
     for d in days:
@@ -226,19 +251,10 @@ async def report_mes(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     country = context.args[0].lower().strip()
     ym = context.args[1].strip()
     try:
-        first = datetime.strptime(ym + "-01", "%Y-%m-%d")
+        days = _range_for("mes", ym)
     except Exception:
         return await update.message.reply_text("Formato inválido. Usa YYYY-MM (ej. 2025-09).")
 
-    # calcular último día del mes
-    if first.month == 12:
-        nextm = first.replace(year=first.year+1, month=1, day=1)
-    else:
-        nextm = first.replace(month=first.month+1, day=1)
-    last = nextm - timedelta(days=1)
-
-    days = opday_list(SET.tz, first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
-
     chunks = []
     for d in days:
         s, e = opday_bounds(SET.tz, d)
@@ -275,25 +291,15 @@ async def zip_period(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
             return await update.message.reply_text("Para mes: /zipperiod <pais> mes <YYYY-MM>")
         ym = context.args[2].strip()
         try:
-            first = datetime.strptime(ym + "-01", "%Y-%m-%d")
+            days = _range_for("mes", ym)
         except Exception:
             return await update.message.reply_text("Formato inválido. Usa YYYY-MM (ej. 2025-09).")
-        if first.month == 12:
-            nextm = first.replace(year=first.year+1, month=1, day=1)
-        else:
-            nextm = first.replace(month=first.month+1, day=1)
-        last = nextm - timedelta(days=1)
-        days = opday_list(SET.tz, first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
         zipname = f"{country}-{ym}_opmonth.zip"
         caption = f"{country.upper()} :: ZIP mes operativo {ym}"
     else:
-        n = 7 if kind=="semana" else 15
-        if len(context.args) >= 3:
-            start_str = context.args[2].strip()
-            days = opday_list(SET.tz, start_str, (datetime.strptime(start_str, "%Y-%m-%d")+timedelta(days=n-1)).strftime("%Y-%m-%d"))
-        else:
-            days = list(reversed(last_n_opdays(SET.tz, n)))
-        zipname = f"{country}-{days[0]}_a_{days[-1]}_{'opweek' if n==7 else 'op15'}.zip"
+        start_str = context.args[2].strip() if len(context.args) >= 3 else None
+        days = _range_for(kind, start_str)
+        zipname = f"{country}-{days[0]}_a_{days[-1]}_{'opweek' if kind=='semana' else 'op15'}.zip"
         caption = f"{country.upper()} :: ZIP {kind} operativa {days[0]} → {days[-1]}"
 
     # Construir ZIP en memoria con un TXT por op-day
@@ -1,3 +1,5 @@
+import hashlib
+from collections import OrderedDict, defaultdict
 from telegram import Update, InputFile
 from telegram.ext import ContextTypes
 from ..config import get_settings
@@ -15,6 +17,22 @@ from botapp.services.incident_parser import parse_incidents_from_text  # importa
 SETTINGS = get_settings()
 STORE = Store(SETTINGS.data_dir)
 
+PARSE_CACHE_MAX = 256
+_PARSE_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+def _parse_cached(text: str) -> tuple:
+    """Parseo de incidentes memoizado por hash del texto ya leído: si el TXT no cambia, no se re-parsea."""
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    hit = _PARSE_CACHE.get(key)
+    if hit is not None:
+        _PARSE_CACHE.move_to_end(key)
+        return hit
+    result = tuple(parse_incidents_from_text(text, default_fuente="TXT Reporte"))
+    _PARSE_CACHE[key] = result
+    if len(_PARSE_CACHE) > PARSE_CACHE_MAX:
+        _PARSE_CACHE.popitem(last=False)
+    return result
+
 async def txt_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     /txt <pais>
@@ -36,15 +54,14 @@ async def txt_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     # Intentar insertar sección “Sucesos / Incidentes”
     try:
         text = Path(fpath).read_text(encoding="utf-8", errors="ignore")
-        incidentes = parse_incidents_from_text(text, default_fuente="TXT Reporte")
+        incidentes = _parse_cached(text)
         print(f"[txt_cmd] incidentes detectados: {incidentes!r}")
 
         if incidentes:
             bloques = ["Sucesos / Incidentes:\n"]
-            cat_map = {}
+            cat_map = defaultdict(list)
             for inc in incidentes:
-                cat = inc.get("categoria", "Otros")
-                cat_map.setdefault(cat, []).append(inc)
+                cat_map[inc.get("categoria", "Otros")].append(inc)
             for cat, lista in cat_map.items():
                 bloques.append(f"{cat}:")
                 for inc in lista:
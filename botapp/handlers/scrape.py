@@ -1,12 +1,14 @@
 from __future__ import annotations
 import asyncio
-import json
+import gzip
 import logging
 import os
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Callable, Optional, Sequence
+from typing import Awaitable, Callable, Optional, Sequence
 
+import orjson
 from telegram import Update
 from telegram.ext import ContextTypes
 
@@ -16,6 +18,11 @@ from ..services.scraper import scrape_source
 from ..utils.time import dt_str
 from ..utils.operational_day import opday_today_str
 
+try:  # pyahocorasick (opcional): búsqueda multi-patrón en una sola pasada
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
 SET = get_settings()
 STORE = Store(SET.data_dir)
 log = logging.getLogger(__name__)
@@ -50,6 +57,23 @@ SCRAPE_DEFAULT_MAX_VISITS: Optional[int] = (
 # Límites adicionales de volumen (se pueden ajustar por variables de entorno)
 SCRAPE_MAX_ITEMS_PER_COUNTRY = _env_int("SCRAPE_MAX_ITEMS_PER_COUNTRY", 200)
 SCRAPE_MAX_ITEMS_PER_DOMAIN = _env_int("SCRAPE_MAX_ITEMS_PER_DOMAIN", 50)
+# URLs recordadas por país para la dedupe (se conservan las más recientes; 0 = sin límite)
+SCRAPE_SEEN_MAX_PER_COUNTRY = _env_int("SCRAPE_SEEN_MAX_PER_COUNTRY", 5000)
+
+# Descargas simultáneas de fuentes (global, compartido entre países)
+SCRAPE_CONCURRENCY = max(1, _env_int("SCRAPE_CONCURRENCY", 8))
+# Países procesados a la vez en el scraping global
+SCRAPE_COUNTRIES_CONCURRENCY = max(1, _env_int("SCRAPE_COUNTRIES_CONCURRENCY", 4))
+_SCRAPE_SEM: asyncio.Semaphore | None = None
+
+# Caché de resultados de scrape_source (evita re-descargar una fuente compartida entre países
+# o entre jobs muy seguidos). 0 = desactivada. Guarda artículos completos, así que el tope es bajo.
+SCRAPE_CACHE_TTL = _env_int("SCRAPE_CACHE_TTL", 300)
+SCRAPE_CACHE_MAX = max(1, _env_int("SCRAPE_CACHE_MAX", 32))
+_ScrapeKey = tuple[str, Optional[int], int, Optional[int], Optional[int]]
+_SCRAPE_CACHE: "OrderedDict[_ScrapeKey, tuple[float, list[dict]]]" = OrderedDict()
+# Descargas en curso: una segunda petición idéntica espera a la misma tarea en vez de repetirla
+_SCRAPE_INFLIGHT: "dict[_ScrapeKey, asyncio.Task[list[dict]]]" = {}
 
 
 def _parse_page_limit(value: Optional[str], default: Optional[int]) -> Optional[int]:
@@ -135,29 +159,70 @@ def _get_scrape_lock() -> asyncio.Lock:
     return _SCRAPE_LOCK
 
 
-# dedupe file
-SEEN_FILE = Path(SET.data_dir) / "scrape_seen.json"
+def _get_scrape_semaphore() -> asyncio.Semaphore:
+    """Semáforo global que limita las descargas simultáneas (SCRAPE_CONCURRENCY)."""
+    global _SCRAPE_SEM
+    if _SCRAPE_SEM is None:
+        _SCRAPE_SEM = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    return _SCRAPE_SEM
+
+
+# dedupe file (gzip; scrape_seen.json es el formato antiguo, solo lectura)
+SEEN_FILE = Path(SET.data_dir) / "scrape_seen.json.gz"
+LEGACY_SEEN_FILE = Path(SET.data_dir) / "scrape_seen.json"
 SourcesDict = dict[str, Sequence[str]]
 
+# Cachés en memoria invalidadas por mtime: (st_mtime_ns, datos)
+_SEEN_CACHE: tuple[int, dict] | None = None
+_CFG_CACHE: tuple[int, SourcesDict] | None = None
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
 
 def _load_seen() -> dict:
-    if SEEN_FILE.exists():
+    global _SEEN_CACHE
+    mtime = _mtime_ns(SEEN_FILE)
+    if mtime is None:
+        # Migración: leer el JSON plano antiguo si aún no existe el .gz
+        if not LEGACY_SEEN_FILE.exists():
+            return {}
         try:
-            return json.loads(SEEN_FILE.read_text(encoding="utf-8"))
+            return orjson.loads(LEGACY_SEEN_FILE.read_bytes())
         except Exception:
             return {}
-    return {}
+    if _SEEN_CACHE is not None and _SEEN_CACHE[0] == mtime:
+        return _SEEN_CACHE[1]
+    try:
+        data = orjson.loads(gzip.decompress(SEEN_FILE.read_bytes()))
+    except Exception:
+        return {}
+    _SEEN_CACHE = (mtime, data)
+    return data
 
 
 def _save_seen(data: dict) -> None:
-    SEEN_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    """Escritura atómica: se vuelca a un .tmp y se renombra, así un corte no corrompe la dedupe."""
+    global _SEEN_CACHE
+    tmp = SEEN_FILE.with_suffix(".gz.tmp")
+    tmp.write_bytes(gzip.compress(orjson.dumps(data)))
+    os.replace(tmp, SEEN_FILE)
+    mtime = _mtime_ns(SEEN_FILE)
+    _SEEN_CACHE = (mtime, data) if mtime is not None else None
 
 
 def _dom(url: str) -> str:
-    try:
-        return url.split("/")[2]
-    except Exception:
+    # "https://host/path" -> "host", sin partir toda la URL
+    i = url.find("://")
+    if i < 0:
         return "web"
+    start = i + 3
+    j = url.find("/", start)
+    return url[start:j] if j > 0 else url[start:]
 
 
 # Filtro simple de palabras clave para quedarnos solo con contenido relevante SICU
@@ -208,9 +273,29 @@ _KEYWORDS = [
 ]
 
 
-def _has_relevant_keywords(title: str, content: str) -> bool:
-    text = f"{title} {content}".lower()
-    return any(k in text for k in _KEYWORDS)
+def _build_keyword_automaton():
+    """
+    Autómata Aho-Corasick con _KEYWORDS, o None si pyahocorasick no está instalado.
+    Se construye al importar el módulo (menos de un milisegundo para esta lista).
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in _KEYWORDS:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_KW_AUTOMATON = _build_keyword_automaton()
+
+
+def _has_relevant_keywords(text_l: str) -> bool:
+    """text_l ya normalizado con casefold()."""
+    if _KW_AUTOMATON is not None:
+        # Corta en la primera coincidencia
+        return next(_KW_AUTOMATON.iter(text_l), None) is not None
+    return any(k in text_l for k in _KEYWORDS)
 
 
 def _load_sources_config() -> SourcesDict:
@@ -224,27 +309,137 @@ def _load_sources_config() -> SourcesDict:
             ...
         }
     """
+    global _CFG_CACHE
     sources_file = Path(SET.data_dir) / "web_sources.json"
-    if not sources_file.exists():
+    mtime = _mtime_ns(sources_file)
+    if mtime is None:
         raise FileNotFoundError("No existe data/web_sources.json")
+    if _CFG_CACHE is not None and _CFG_CACHE[0] == mtime:
+        return _CFG_CACHE[1]
     try:
-        data = json.loads(sources_file.read_text(encoding="utf-8"))
+        data = orjson.loads(sources_file.read_bytes())
     except Exception as exc:
         raise ValueError(f"Error leyendo web_sources.json: {exc}") from exc
     if not isinstance(data, dict):
         raise ValueError("El archivo web_sources.json debe ser un diccionario pais -> [urls].")
+    _CFG_CACHE = (mtime, data)
     return data
 
 
-def _get_summarizer() -> tuple[bool, Optional[Callable[[str, str], str]]]:
+# [(título, contenido), ...] -> [resumen, ...] (mismo orden; "" si ese resumen falló)
+Summarizer = Callable[[Sequence[tuple[str, str]]], Awaitable[list[str]]]
+
+
+def _get_summarizer() -> tuple[bool, Optional[Summarizer]]:
     try:
-        from ..services.ai import summarize_article_es  # opcional
+        from ..services.ai import summarize_many_es  # opcional
 
-        return True, summarize_article_es
+        return True, summarize_many_es
     except Exception:
         return False, None
 
 
+def _select_articles(
+    arts: Sequence[dict],
+    *,
+    min_len: int,
+    seen_set: set[str],
+    per_domain_count: dict[str, int],
+    remaining: Optional[int],
+) -> list[tuple[str, str, str, str]]:
+    """
+    Filtra los artículos de una fuente (sin resumir: los resúmenes se piden después, en lote).
+    Sin await: pensado para ejecutarse con asyncio.to_thread.
+    Actualiza seen_set y per_domain_count; devuelve [(link, dominio, título, contenido)].
+    """
+    entries: list[tuple[str, str, str, str]] = []
+    for a in arts:
+        if remaining is not None and len(entries) >= remaining:
+            # Corte duro por país para no saturar
+            break
+
+        link = (a.get("url") or "").strip()
+        title = (a.get("title") or "").strip()
+        content = (a.get("content") or "").strip()
+
+        # Requisitos mínimos estrictos
+        if not (link and title and content):
+            continue
+        if not link.startswith("https://"):
+            # Forzamos solo HTTPS
+            continue
+        if len(content) < min_len:
+            continue
+        # Filtro SICU básico por palabras clave: primero el título y, solo si no basta, el contenido
+        if not (_has_relevant_keywords(title.casefold()) or _has_relevant_keywords(content.casefold())):
+            continue
+        if link in seen_set:
+            # Ya lo guardamos en ejecuciones anteriores
+            continue
+
+        # Límite por dominio
+        dom = _dom(link)
+        dom_count = per_domain_count.get(dom, 0)
+        if SCRAPE_MAX_ITEMS_PER_DOMAIN > 0 and dom_count >= SCRAPE_MAX_ITEMS_PER_DOMAIN:
+            continue
+
+        entries.append((link, dom, title, content))
+        seen_set.add(link)
+        per_domain_count[dom] = dom_count + 1
+    return entries
+
+
+def _entry_text(title: str, link: str, content: str, summary: str) -> str:
+    if summary:
+        return f"{title}\n{link}\n\nResumen:\n{summary}\n\n{content[:2000]}"
+    return f"{title}\n{link}\n\n{content[:2000]}"
+
+
+async def _scrape_source_cached(
+    url: str,
+    *,
+    max_pages: Optional[int],
+    min_len: int,
+    visit_factor: Optional[int],
+    max_visits: Optional[int],
+) -> list[dict]:
+    """
+    scrape_source con caché LRU en memoria de SCRAPE_CACHE_TTL segundos.
+    Las descargas idénticas simultáneas comparten una única tarea (que toma el semáforo
+    global); cancelar a uno de los que esperan no cancela la descarga de los demás.
+    """
+    key: _ScrapeKey = (url, max_pages, min_len, visit_factor, max_visits)
+    now = time.monotonic()
+    hit = _SCRAPE_CACHE.get(key)
+    if hit is not None and hit[0] > now:
+        _SCRAPE_CACHE.move_to_end(key)
+        return hit[1]
+
+    task = _SCRAPE_INFLIGHT.get(key)
+    if task is None:
+        async def _download() -> list[dict]:
+            async with _get_scrape_semaphore():
+                return await scrape_source(
+                    url,
+                    max_pages=max_pages,
+                    min_content_len=min_len,
+                    visit_factor=visit_factor,
+                    max_visits=max_visits,
+                )
+
+        def _done(t: "asyncio.Task[list[dict]]") -> None:
+            _SCRAPE_INFLIGHT.pop(key, None)
+            if SCRAPE_CACHE_TTL > 0 and not t.cancelled() and t.exception() is None:
+                _SCRAPE_CACHE[key] = (time.monotonic() + SCRAPE_CACHE_TTL, t.result())
+                _SCRAPE_CACHE.move_to_end(key)
+                while len(_SCRAPE_CACHE) > SCRAPE_CACHE_MAX:
+                    _SCRAPE_CACHE.popitem(last=False)
+
+        task = _SCRAPE_INFLIGHT[key] = asyncio.create_task(_download())
+        task.add_done_callback(_done)
+    return await asyncio.shield(task)
+
+
 async def _scrape_country_sources(
     country: str,
     urls: Sequence[str],
@@ -254,13 +449,13 @@ async def _scrape_country_sources(
     day: str,
     seen: dict,
     use_ai: bool,
-    summarize: Optional[Callable[[str, str], str]],
+    summarize: Optional[Summarizer],
     visit_factor: Optional[int],
     max_visits: Optional[int],
 ) -> tuple[int, list[tuple[str, int, str]]]:
     """
     Raspa todas las URLs de un país, aplicando:
-    - dedupe por URL (scrape_seen.json)
+    - dedupe por URL (scrape_seen.json.gz)
     - límite de ítems por país y por dominio
     - filtro HTTPS
     - filtro de longitud y palabras clave relevantes
@@ -271,85 +466,71 @@ async def _scrape_country_sources(
     per_site: list[tuple[str, int, str]] = []
     per_domain_count: dict[str, int] = {}
 
-    for url in urls:
-        # Si ya hemos llegado al máximo por país, no seguimos con más fuentes.
-        if SCRAPE_MAX_ITEMS_PER_COUNTRY > 0 and total >= SCRAPE_MAX_ITEMS_PER_COUNTRY:
-            per_site.append((url, 0, "skip:max_country"))
-            continue
-
+    async def _fetch(url: str) -> list[dict] | Exception:
         try:
-            arts = await scrape_source(
+            # El semáforo global lo toma la descarga compartida, no cada espera
+            return await _scrape_source_cached(
                 url,
                 max_pages=max_pages,
-                min_content_len=min_len,
+                min_len=min_len,
                 visit_factor=visit_factor,
                 max_visits=max_visits,
             )
-            count = 0
-            for a in arts:
-                link = (a.get("url") or "").strip()
-                title = (a.get("title") or "").strip()
-                content = (a.get("content") or "").strip()
-
-                # Requisitos mínimos estrictos
-                if not (link and title and content):
-                    continue
-                if not link.startswith("https://"):
-                    # Forzamos solo HTTPS
-                    continue
-                if len(content) < min_len:
-                    continue
-                if not _has_relevant_keywords(title, content):
-                    # Filtro SICU básico por palabras clave
-                    continue
-                if link in seen_set:
-                    # Ya lo guardamos en ejecuciones anteriores
-                    continue
-
-                # Límite por dominio
-                dom = _dom(link)
-                dom_count = per_domain_count.get(dom, 0)
-                if SCRAPE_MAX_ITEMS_PER_DOMAIN > 0 and dom_count >= SCRAPE_MAX_ITEMS_PER_DOMAIN:
-                    continue
-
-                summary = ""
-                if use_ai and summarize:
+        except Exception as exc:
+            return exc
+
+    # Productores: una descarga por fuente, en paralelo. Consumidor: este bucle, que procesa
+    # cada fuente en cuanto termina su descarga pero respetando el orden de `urls`
+    # (los límites por país/dominio dan siempre el mismo resultado).
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(_fetch(url)) for url in urls]
+        for url, task in zip(urls, tasks):
+            # Si ya hemos llegado al máximo por país, no seguimos con más fuentes.
+            if SCRAPE_MAX_ITEMS_PER_COUNTRY > 0 and total >= SCRAPE_MAX_ITEMS_PER_COUNTRY:
+                task.cancel()
+                per_site.append((url, 0, "skip:max_country"))
+                continue
+            arts = await task
+            if isinstance(arts, Exception):
+                per_site.append((url, 0, f"error:{arts}"))
+                continue
+
+            try:
+                remaining = (
+                    SCRAPE_MAX_ITEMS_PER_COUNTRY - total if SCRAPE_MAX_ITEMS_PER_COUNTRY > 0 else None
+                )
+                # Filtrado (CPU) en un hilo
+                selected = await asyncio.to_thread(
+                    _select_articles,
+                    arts,
+                    min_len=min_len,
+                    seen_set=seen_set,
+                    per_domain_count=per_domain_count,
+                    remaining=remaining,
+                )
+                # Resúmenes AI de toda la fuente en paralelo (acotado dentro de summarize)
+                summaries = [""] * len(selected)
+                if use_ai and summarize and selected:
                     try:
-                        summary = summarize(title, content)
+                        summaries = await summarize([(title, content) for _, _, title, content in selected])
                     except Exception:
-                        summary = ""
-
-                body_lines = [title, link, ""]
-                if summary:
-                    body_lines.append("Resumen:")
-                    body_lines.append(summary)
-                    body_lines.append("")
-                body_lines.append(content[:2000])
-
-                STORE.append_entry(
-                    country=country,
-                    day=day,
-                    title=f"WEB {_dom(link)}",
-                    dt=dt_str(SET.tz),
-                    text="\n".join(body_lines),
-                )
-                seen_list.append(link)
-                seen_set.add(link)
-
-                per_domain_count[dom] = dom_count + 1
-                count += 1
-                total += 1
-
-                # Cortes duros por país / dominio para no saturar
-                if SCRAPE_MAX_ITEMS_PER_COUNTRY > 0 and total >= SCRAPE_MAX_ITEMS_PER_COUNTRY:
-                    break
-                if SCRAPE_MAX_ITEMS_PER_DOMAIN > 0 and per_domain_count[dom] >= SCRAPE_MAX_ITEMS_PER_DOMAIN:
-                    # No hace falta seguir con más artículos de este dominio
-                    continue
-
-            per_site.append((url, count, "ok"))
-        except Exception as ex:
-            per_site.append((url, 0, f"error:{ex}"))
+                        pass
+                entries = [
+                    (link, dom, _entry_text(title, link, content, summary))
+                    for (link, dom, title, content), summary in zip(selected, summaries)
+                ]
+                now = dt_str(SET.tz)  # misma marca horaria para todo el lote de la fuente
+                STORE.append_entries(country, day, ((f"WEB {dom}", now, text) for _, dom, text in entries))
+                seen_list.extend(link for link, _, _ in entries)
+                count = len(entries)
+                total += count
+                per_site.append((url, count, "ok"))
+            except Exception as ex:
+                per_site.append((url, 0, f"error:{ex}"))
+
+    # Acotar el histórico de dedupe: solo las URLs más recientes
+    if total and SCRAPE_SEEN_MAX_PER_COUNTRY > 0 and len(seen_list) > SCRAPE_SEEN_MAX_PER_COUNTRY:
+        del seen_list[:-SCRAPE_SEEN_MAX_PER_COUNTRY]
     return total, per_site
 
 
@@ -360,32 +541,35 @@ async def _scrape_all_core(
     min_len: int,
     seen: dict,
     use_ai: bool,
-    summarize: Optional[Callable[[str, str], str]],
+    summarize: Optional[Summarizer],
     visit_factor: Optional[int],
     max_visits: Optional[int],
 ) -> tuple[int, list[tuple[str, int, list[tuple[str, int, str]]]]]:
-    overall_total = 0
-    country_reports: list[tuple[str, int, list[tuple[str, int, str]]]] = []
     day = opday_today_str(SET.tz)
-    for country in sorted(sources.keys()):
+    # Cada país usa su propia entrada en `seen` y su propio TXT: se pueden procesar en paralelo.
+    country_sem = asyncio.Semaphore(SCRAPE_COUNTRIES_CONCURRENCY)
+
+    async def _one_country(country: str) -> tuple[str, int, list[tuple[str, int, str]]]:
         urls = sources.get(country, []) or []
         if not urls:
-            country_reports.append((country, 0, []))
-            continue
-        total, per_site = await _scrape_country_sources(
-            country,
-            urls,
-            max_pages=max_pages,
-            min_len=min_len,
-            day=day,
-            seen=seen,
-            use_ai=use_ai,
-            summarize=summarize,
-            visit_factor=visit_factor,
-            max_visits=max_visits,
-        )
-        overall_total += total
-        country_reports.append((country, total, per_site))
+            return country, 0, []
+        async with country_sem:
+            total, per_site = await _scrape_country_sources(
+                country,
+                urls,
+                max_pages=max_pages,
+                min_len=min_len,
+                day=day,
+                seen=seen,
+                use_ai=use_ai,
+                summarize=summarize,
+                visit_factor=visit_factor,
+                max_visits=max_visits,
+            )
+        return country, total, per_site
+
+    country_reports = list(await asyncio.gather(*(_one_country(c) for c in sorted(sources.keys()))))
+    overall_total = sum(total for _, total, _ in country_reports)
     return overall_total, country_reports
 
 
@@ -481,7 +665,8 @@ async def scrape(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             visit_factor=visit_factor,
             max_visits=max_visits,
         )
-        _save_seen(seen)
+        if total:
+            await asyncio.to_thread(_save_seen, seen)
     lines = [
         (
             f"✅ Scraping completado [{country}] fuentes={len(urls)} "
@@ -501,7 +686,7 @@ async def scrape_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     """
     /scrape_all [max_paginas|full] [min_len=50] [visit_factor=3]
     Raspa todas las fuentes definidas en data/web_sources.json para todos los países.
-    Mantiene la dedupe por país (data/scrape_seen.json), el guardado en TXT y el resumen opcional con AI.
+    Mantiene la dedupe por país (data/scrape_seen.json.gz), el guardado en TXT y el resumen opcional con AI.
     """
     # Parsear args (opcionalmente max_pages, min_len y visit_factor)
     args = context.args or []
@@ -542,7 +727,8 @@ async def scrape_all(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
             visit_factor=visit_factor,
             max_visits=max_visits,
         )
-        _save_seen(seen)
+        if overall_total:
+            await asyncio.to_thread(_save_seen, seen)
     summary = _build_scrape_summary(
         countries=len(sources),
         max_pages=max_pages,
@@ -573,67 +759,52 @@ async def scrape_auto_job(context: ContextTypes.DEFAULT_TYPE) -> None:
 
     start = time.perf_counter()
     summary: Optional[str] = None
+    error_text: Optional[str] = None
 
+    # Dentro del candado solo se raspa y se guarda; los avisos a Telegram se envían después.
     async with lock:
         try:
             sources = _load_sources_config()
-        except FileNotFoundError as exc:
+        except (FileNotFoundError, ValueError) as exc:
             log.warning("[scrape-auto] %s", exc)
-            if chat_id:
-                try:
-                    await context.bot.send_message(chat_id=chat_id, text=str(exc))
-                except Exception:
-                    log.exception("[scrape-auto] No se pudo notificar chat_id=%s", chat_id)
-            return
-        except ValueError as exc:
-            log.warning("[scrape-auto] %s", exc)
-            if chat_id:
-                try:
-                    await context.bot.send_message(chat_id=chat_id, text=str(exc))
-                except Exception:
-                    log.exception("[scrape-auto] No se pudo notificar chat_id=%s", chat_id)
-            return
+            error_text = str(exc)
+        else:
+            seen = _load_seen()
+            use_ai, summarize = _get_summarizer()
+            try:
+                overall_total, country_reports = await _scrape_all_core(
+                    sources,
+                    max_pages=max_pages,
+                    min_len=min_len,
+                    seen=seen,
+                    use_ai=use_ai,
+                    summarize=summarize,
+                    visit_factor=visit_factor,
+                    max_visits=max_visits,
+                )
+            except Exception as exc:
+                log.exception("[scrape-auto] Error durante scraping periódico: %s", exc)
+                error_text = f"❗ Error en scraping automático: {exc}"
+            else:
+                if overall_total:
+                    await asyncio.to_thread(_save_seen, seen)
+                summary = _build_scrape_summary(
+                    countries=len(sources),
+                    max_pages=max_pages,
+                    min_len=min_len,
+                    visit_factor=visit_factor,
+                    overall_total=overall_total,
+                    reports=country_reports,
+                )
 
-        seen = _load_seen()
-        use_ai, summarize = _get_summarizer()
-        try:
-            overall_total, country_reports = await _scrape_all_core(
-                sources,
-                max_pages=max_pages,
-                min_len=min_len,
-                seen=seen,
-                use_ai=use_ai,
-                summarize=summarize,
-                visit_factor=visit_factor,
-                max_visits=max_visits,
-            )
-        except Exception as exc:
-            log.exception("[scrape-auto] Error durante scraping periódico: %s", exc)
-            if chat_id:
-                try:
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=f"❗ Error en scraping automático: {exc}",
-                    )
-                except Exception:
-                    log.exception("[scrape-auto] No se pudo notificar chat_id=%s", chat_id)
-            return
-
-        _save_seen(seen)
-        summary = _build_scrape_summary(
-            countries=len(sources),
-            max_pages=max_pages,
-            min_len=min_len,
-            visit_factor=visit_factor,
-            overall_total=overall_total,
-            reports=country_reports,
-        )
+    if summary is not None:
         first_line = summary.splitlines()[0] if summary else "Scraping completado."
         duration = time.perf_counter() - start
         log.info("[scrape-auto] Finalizado en %.1fs. %s", duration, first_line)
 
-    if summary and chat_id:
+    text = error_text or summary
+    if text and chat_id:
         try:
-            await context.bot.send_message(chat_id=chat_id, text=summary)
+            await context.bot.send_message(chat_id=chat_id, text=text)
         except Exception:
-            log.exception("[scrape-auto] No se pudo notificar chat_id=%s", chat_id)
\ No newline at end of file
+            log.exception("[scrape-auto] No se pudo notificar chat_id=%s", chat_id)
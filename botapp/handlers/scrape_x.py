@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
+import orjson
 from telegram import Update
 from telegram.ext import ContextTypes
 
@@ -11,25 +16,168 @@ from ..config import get_settings
 from ..services.store import Store
 from ..utils.time import dt_str
 from ..utils.operational_day import opday_today_str
-from botapp.services.x_sources import get_x_sources  # fuentes X por país (x_sources.json)
+from botapp.services.x_sources import get_x_sources_clean  # fuentes X por país (x_sources.json)
+
+# snscrape se importa una sola vez; si falta, se avisa en cada intento de scraping
+try:
+    import snscrape.modules.twitter as sntwitter
+    _SNSCRAPE_ERROR: Optional[Exception] = None
+except Exception as e:  # pragma: no cover - depende del entorno
+    sntwitter = None
+    _SNSCRAPE_ERROR = e
 
 SET = get_settings()
 STORE = Store(SET.data_dir)
 
+# Cuentas raspadas a la vez (snscrape es síncrono: cada una ocupa un hilo)
+X_CONCURRENCY = 4
+# IDs ya vistos consecutivos tras los que se deja de leer el timeline de una cuenta
+X_STOP_AFTER_KNOWN = 3
+# Tiempo máximo de descarga por cuenta, contado desde que el hilo empieza de verdad
+# (el hilo de snscrape no se puede matar, pero se libera el turno). La espera en la cola
+# del pool tiene el mismo plazo: si todos los hilos están colgados, la cuenta se da por agotada.
+X_HANDLE_TIMEOUT = 30
+
+# Intervalo adaptativo de /scrape_x_job (segundos): se dobla si no hay tweets nuevos
+# y se divide a la mitad si hay X_JOB_BUSY o más.
+X_JOB_INTERVAL = 600
+X_JOB_MIN_INTERVAL = 120
+X_JOB_MAX_INTERVAL = 3600
+X_JOB_BUSY = 5
+
+_SEEN_LOCK: asyncio.Lock | None = None
+_X_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _get_x_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos propio para snscrape: un timeline lento ocupa uno de estos hilos
+    y no el executor por defecto del loop, que usan los demás handlers (to_thread).
+    """
+    global _X_EXECUTOR
+    if _X_EXECUTOR is None:
+        _X_EXECUTOR = ThreadPoolExecutor(max_workers=X_CONCURRENCY, thread_name_prefix="scrape_x")
+    return _X_EXECUTOR
+
+
+# Un scraper por cuenta, reutilizado entre ejecuciones: conserva su requests.Session
+# (conexiones keep-alive / TLS) y el guest token, en vez de renegociarlos cada vez.
+# Los scrapers de snscrape no son thread-safe: se sacan de la caché mientras se usan
+# (un uso concurrente de la misma cuenta crea uno nuevo) y se devuelven al terminar.
+X_SCRAPER_CACHE_MAX = 256
+_SCRAPERS: Dict[str, object] = {}
+_SCRAPERS_LOCK = threading.Lock()
+
+
+def _checkout_scraper(username: str):
+    with _SCRAPERS_LOCK:
+        scraper = _SCRAPERS.pop(username, None)
+    return scraper if scraper is not None else sntwitter.TwitterUserScraper(username)
+
+
+def _return_scraper(username: str, scraper) -> None:
+    with _SCRAPERS_LOCK:
+        if username not in _SCRAPERS and len(_SCRAPERS) >= X_SCRAPER_CACHE_MAX:
+            _SCRAPERS.pop(next(iter(_SCRAPERS)))
+        _SCRAPERS[username] = scraper
+
+
+def _get_seen_lock() -> asyncio.Lock:
+    """Serializa carga → actualización → guardado de scrape_seen_x.json entre cuentas en paralelo."""
+    global _SEEN_LOCK
+    if _SEEN_LOCK is None:
+        _SEEN_LOCK = asyncio.Lock()
+    return _SEEN_LOCK
+
 SEEN_X = Path(SET.data_dir) / "scrape_seen_x.json"
 
 
-def _load_seen() -> Dict[str, Dict[str, List[str]]]:
+def _load_seen() -> Dict[str, Dict[str, Set[str]]]:
+    """En disco son listas; en memoria, sets (pertenencia O(1))."""
     if SEEN_X.exists():
         try:
-            return json.loads(SEEN_X.read_text(encoding="utf-8"))
+            raw = orjson.loads(SEEN_X.read_bytes())
+            return {
+                country: {user: set(ids) for user, ids in users.items()}
+                for country, users in raw.items()
+            }
         except Exception:
             return {}
     return {}
 
 
-def _save_seen(d: Dict[str, Dict[str, List[str]]]) -> None:
-    SEEN_X.write_text(json.dumps(d, ensure_ascii=False, indent=2), encoding="utf-8")
+def _save_seen(d: Dict[str, Dict[str, Set[str]]]) -> None:
+    """Escritura atómica (.tmp + rename): un lector nunca ve el fichero a medias."""
+    raw = {country: {user: sorted(ids) for user, ids in users.items()} for country, users in d.items()}
+    tmp = SEEN_X.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(raw))  # compacto: solo lo lee el bot
+    os.replace(tmp, SEEN_X)
+
+
+async def _notify(message: Optional[Update], txt: str) -> None:
+    if message:
+        await message.reply_text(txt)
+    else:
+        print(f"[scrape_x_job] {txt}")
+
+
+Tweet = Tuple[str, str, str, str]
+
+
+def _fetch_tweets(username: str, limit: int, known: Set[str]) -> Tuple[List[Tweet], int]:
+    """
+    Descarga síncrona (snscrape) de los últimos `limit` tweets; se ejecuta en un hilo.
+    Devuelve (tuplas (id, fecha, texto, url) no presentes en `known`, tweets leídos en total).
+    Los tweets llegan del más nuevo al más antiguo: tras X_STOP_AFTER_KNOWN IDs seguidos
+    ya guardados, el resto también lo está y se deja de paginar.
+    """
+    scraper = _checkout_scraper(username)
+    out = []
+    fetched = 0
+    known_run = 0
+    items = None
+    try:
+        items = scraper.get_items()
+        for t in islice(items, limit):
+            fetched += 1
+            tid = str(t.id or "")
+            if tid in known:
+                known_run += 1
+                if known_run >= X_STOP_AFTER_KNOWN:
+                    break
+                continue
+            known_run = 0
+            # rawContent en snscrape reciente; content en versiones antiguas
+            content = getattr(t, "rawContent", None) or t.content
+            out.append((tid, str(t.date or ""), content or "", f"https://x.com/{username}/status/{tid}"))
+    finally:
+        if items is not None:
+            items.close()  # cierra el timeline a medias antes de que otro hilo reutilice el scraper
+        _return_scraper(username, scraper)
+    return out, fetched
+
+
+async def _run_fetch(username: str, limit: int, known: Set[str]) -> Tuple[List[Tweet], int]:
+    """
+    _fetch_tweets en el pool de X con X_HANDLE_TIMEOUT contado desde que el hilo arranca:
+    si hay hilos colgados de ejecuciones anteriores, la espera en cola no consume el plazo,
+    pero tiene el suyo propio (X_HANDLE_TIMEOUT): con el pool lleno de hilos colgados
+    se cancela el trabajo en cola y se lanza TimeoutError en vez de esperar para siempre.
+    """
+    loop = asyncio.get_running_loop()
+    started = asyncio.Event()
+
+    def _job() -> Tuple[List[Tweet], int]:
+        loop.call_soon_threadsafe(started.set)
+        return _fetch_tweets(username, limit, known)
+
+    fut = loop.run_in_executor(_get_x_executor(), _job)
+    try:
+        await asyncio.wait_for(started.wait(), timeout=X_HANDLE_TIMEOUT)
+    except TimeoutError:
+        fut.cancel()  # aún en cola: se retira sin llegar a ocupar un hilo
+        raise
+    return await asyncio.wait_for(fut, timeout=X_HANDLE_TIMEOUT)
 
 
 async def _scrape_one_handle(
@@ -37,98 +185,113 @@ async def _scrape_one_handle(
     username: str,
     limit: int,
     message: Optional[Update] = None,
+    seen: Optional[Dict[str, Dict[str, Set[str]]]] = None,
 ) -> int:
     """
     Scrapea hasta `limit` tweets de @username (desde X/Twitter) y los añade al STORE
     si no estaban ya en scrape_seen_x.json.
+    `seen`: estado ya cargado por el llamador (una lectura por ejecución); si falta, se lee aquí.
 
     Devuelve el número de tweets añadidos.
     Si `message` no es None, envía avisos de error al chat; si es None, imprime por consola.
+    Lanza TimeoutError si la descarga supera X_HANDLE_TIMEOUT (el guardado no tiene plazo).
     """
     username = username.lstrip("@").strip()
     if not username:
         return 0
 
-    # 1) Importar snscrape (ya estamos en Python 3.11, no necesitamos parches)
-    try:
-        import snscrape.modules.twitter as sntwitter
-    except Exception as e:
-        txt = (
+    # 1) snscrape disponible (ya estamos en Python 3.11, no necesitamos parches)
+    if sntwitter is None:
+        await _notify(
+            message,
             "No se pudo importar snscrape.\n"
             "- Asegúrate de que está instalado en este entorno (.venv311).\n"
             "  Ejemplo: python -m pip install snscrape\n"
-            f"Error real: {e}"
+            f"Error real: {_SNSCRAPE_ERROR}",
         )
-        if message:
-            await message.reply_text(txt)
-        else:
-            print(f"[scrape_x_job] {txt}")
         return 0
 
-    # 2) Cargar / inicializar SEEN y día operativo
-    seen: Dict[str, Dict[str, List[str]]] = _load_seen()
-    seen.setdefault(country, {})
-    seen[country].setdefault(username, [])
-
-    day = opday_today_str(SET.tz)
-
-    # 3) Recoger tweets con snscrape
+    # 2) Recoger tweets con snscrape (bloqueante → pool de hilos dedicado, con plazo)
+    if seen is None:
+        seen = await asyncio.to_thread(_load_seen)
+    known = seen.get(country, {}).get(username, set())
     try:
-        scraper = sntwitter.TwitterUserScraper(username)
-        tweets = []
-        for i, t in enumerate(scraper.get_items()):
-            if i >= limit:
-                break
-            tweets.append({
-                "id": getattr(t, "id", None),
-                "date": getattr(t, "date", None),
-                "content": getattr(t, "rawContent", "") or getattr(t, "content", ""),
-                "url": f"https://x.com/{username}/status/{getattr(t, 'id', '')}",
-            })
+        tweets, fetched = await _run_fetch(username, limit, known)
+    except TimeoutError:
+        raise
     except Exception as e:
-        txt = f"No puedo obtener tweets de @{username}: {e}"
-        if message:
-            await message.reply_text(txt)
-        else:
-            print(f"[scrape_x_job] {txt}")
+        await _notify(message, f"No puedo obtener tweets de @{username}: {e}")
         return 0
 
-    if not tweets:
-        txt = f"No hubo tweets recientes para @{username}."
-        if message:
-            await message.reply_text(txt)
-        else:
-            print(f"[scrape_x_job] {txt}")
+    if not fetched:
+        await _notify(message, f"No hubo tweets recientes para @{username}.")
         return 0
+    if not tweets:
+        return 0  # solo tweets ya vistos: nada que avisar
 
-    # 4) Añadir solo tweets nuevos
-    added = 0
-    for tw in tweets:
-        tid = str(tw.get("id") or "")
-        if not tid or tid in seen[country][username]:
-            continue
-
-        text = (tw.get("content") or "").strip()
-        if not text:
-            continue
-
-        url = (tw.get("url") or "").strip()
-        dtline = str(tw.get("date") or "")
-
-        STORE.append_entry(
-            country=country,
-            day=day,
-            title=f"X @{username}",
-            dt=dt_str(SET.tz),
-            text=f"{dtline}\n{url}\n\n{text}",
-        )
-        seen[country][username].append(tid)
-        added += 1
+    # 3) Releer SEEN (en un hilo), añadir y guardar bajo candado: varias cuentas en paralelo
+    #    no se pisan el fichero.
+    async with _get_seen_lock():
+        current = await asyncio.to_thread(_load_seen)
+        seen_ids = current.setdefault(country, {}).setdefault(username, set())
 
-    _save_seen(seen)
+        day = opday_today_str(SET.tz)
+        now = dt_str(SET.tz)  # misma marca horaria para todos los tweets de la cuenta
+
+        # 4) Añadir solo tweets nuevos (una única escritura al TXT)
+        entries = []
+        for tid, dtline, text, url in tweets:
+            if not tid or tid in seen_ids:
+                continue
+
+            text = text.strip()
+            if not text:
+                continue
+
+            entries.append((f"X @{username}", now, f"{dtline}\n{url}\n\n{text}"))
+            seen_ids.add(tid)
+
+        added = len(entries)
+        if added:
+            await asyncio.to_thread(STORE.append_entries, country, day, entries)
+            await asyncio.to_thread(_save_seen, current)
     return added
 
 
+async def _scrape_handles(
+    country: str,
+    handles: List[str],
+    limit: int,
+    message: Optional[Update] = None,
+) -> tuple[int, int, int]:
+    """
+    Scrapea varias cuentas en paralelo (máx. X_CONCURRENCY a la vez).
+    `handles` ya vienen limpios (get_x_sources_clean).
+    Cada cuenta tiene X_HANDLE_TIMEOUT segundos de descarga: una cuenta colgada no bloquea el resumen.
+    Devuelve (cuentas procesadas, tweets añadidos, cuentas que agotaron el tiempo).
+    """
+    sem = asyncio.Semaphore(X_CONCURRENCY)
+    timed_out = 0
+    seen = await asyncio.to_thread(_load_seen)  # IDs conocidos: una sola lectura por ejecución
+
+    async def _one(handle: str) -> int:
+        nonlocal timed_out
+        async with sem:
+            try:
+                return await _scrape_one_handle(country, handle, limit, message, seen)
+            except TimeoutError:
+                timed_out += 1
+                print(f"[scrape_x_job] @{handle}: sin respuesta en {X_HANDLE_TIMEOUT}s")
+            except Exception as e:
+                # Un fallo en una cuenta (p.ej. 429) no tumba al resto
+                print(f"[scrape_x_job] error en @{handle}: {e!r}")
+            return 0
+
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(_one(h)) for h in handles]
+    return len(handles), sum(t.result() for t in tasks), timed_out
+
+
 # ======================================================
 #          COMANDO MANUAL: /scrape_x
 # ======================================================
@@ -161,7 +324,7 @@ async def scrape_x(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     # Caso: ALL → usar las fuentes de x_sources.json
     if user_arg.lower() == "all":
-        handles = get_x_sources(country)
+        handles = get_x_sources_clean(country)
         if not handles:
             return await message.reply_text(
                 f"No hay fuentes X configuradas para el país: {country}"
@@ -171,19 +334,12 @@ async def scrape_x(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             f"⏳ Iniciando scraping X para {len(handles)} cuentas de {country} (límite={limit})…"
         )
 
-        total_added = 0
-        total_handles = 0
-        for h in handles:
-            handle_clean = h.lstrip("@")
-            if not handle_clean:
-                continue
-            total_handles += 1
-            added = await _scrape_one_handle(country, handle_clean, limit, message)
-            total_added += added
+        total_handles, total_added, timed_out = await _scrape_handles(country, handles, limit, message)
 
         return await message.reply_text(
             f"✅ Scraping X completado para {total_handles} cuentas de {country}. "
             f"Tweets añadidos: {total_added}."
+            + (f" Sin respuesta: {timed_out}." if timed_out else "")
         )
 
     # Caso: un único usuario
@@ -192,7 +348,10 @@ async def scrape_x(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         f"⏳ Scrapeando X para {country}/@{username} (límite={limit})…"
     )
 
-    added = await _scrape_one_handle(country, username, limit, message)
+    try:
+        added = await _scrape_one_handle(country, username, limit, message)
+    except TimeoutError:
+        return await message.reply_text(f"⌛ @{username}: sin respuesta de X en {X_HANDLE_TIMEOUT}s.")
     return await message.reply_text(
         f"✅ Scraping X completado. Añadidos {added} tweets de @{username} en {country}."
     )
@@ -201,49 +360,74 @@ async def scrape_x(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 # ======================================================
 #          JOB: /scrape_x_job  (cada 10 minutos)
 # ======================================================
+# Generación vigente de cada job (por nombre): al reconfigurar /scrape_x_job se incrementa,
+# y una ejecución de una generación anterior ya no se reprograma (evita cadenas duplicadas).
+_JOB_GEN: Dict[str, int] = {}
+
+
+def _next_interval(current: int, added: int) -> int:
+    if added == 0:
+        return min(X_JOB_MAX_INTERVAL, current * 2)
+    if added >= X_JOB_BUSY:
+        return max(X_JOB_MIN_INTERVAL, current // 2)
+    return current
+
+
 async def scrape_x_job_callback(context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    Callback del JobQueue. Se ejecuta automáticamente cada N segundos
-    con los datos configurados por /scrape_x_job.
+    Callback del JobQueue. Se reprograma a sí mismo (run_once) con un intervalo
+    que se adapta al número de tweets nuevos de la última ejecución.
+    La reprogramación va en `finally` (un error no corta la cadena) y solo si el
+    job sigue siendo la generación vigente de su nombre.
     """
     job = context.job
     data = job.data or {}
+    if _JOB_GEN.get(job.name) != data.get("gen"):
+        return  # job reconfigurado con /scrape_x_job: esta cadena termina aquí
     country = str(data.get("country", "haiti")).lower()
     limit = int(data.get("limit", 10))
+    interval = int(data.get("interval", X_JOB_INTERVAL))
     chat_id = job.chat_id
+    next_interval = interval
+
+    try:
+        handles = get_x_sources_clean(country)
+        if not handles:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=f"[scrape_x_job] No hay fuentes X configuradas para {country}.",
+            )
+            return
 
-    handles = get_x_sources(country)
-    if not handles:
+        total_handles, total_added, timed_out = await _scrape_handles(country, handles, limit, None)
+        next_interval = _next_interval(interval, total_added)
         await context.bot.send_message(
             chat_id=chat_id,
-            text=f"[scrape_x_job] No hay fuentes X configuradas para {country}.",
+            text=(
+                f"⏱️ Job /scrape_x_job ({country}) ejecutado.\n"
+                f"Cuentas: {total_handles} | Sin respuesta: {timed_out} | "
+                f"Tweets nuevos añadidos: {total_added}.\n"
+                f"Próxima ejecución en {next_interval // 60} min."
+            ),
         )
-        return
-
-    total_added = 0
-    total_handles = 0
-    for h in handles:
-        handle_clean = h.lstrip("@")
-        if not handle_clean:
-            continue
-        total_handles += 1
-        added = await _scrape_one_handle(country, handle_clean, limit, None)
-        total_added += added
-
-    await context.bot.send_message(
-        chat_id=chat_id,
-        text=(
-            f"⏱️ Job /scrape_x_job ({country}) ejecutado.\n"
-            f"Cuentas: {total_handles} | Tweets nuevos añadidos: {total_added}."
-        ),
-    )
+    except Exception as e:
+        print(f"[scrape_x_job] error en {country}: {e!r}")
+    finally:
+        if _JOB_GEN.get(job.name) == data.get("gen"):
+            context.job_queue.run_once(
+                scrape_x_job_callback,
+                when=next_interval,
+                chat_id=chat_id,
+                name=job.name,
+                data={**data, "interval": next_interval},
+            )
 
 
 async def scrape_x_job(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     /scrape_x_job <pais> [limit]
 
-    Programa un job que cada 10 minutos:
+    Programa un job que cada ~10 minutos (entre 2 y 60 según la actividad):
       - Lee las fuentes X de ese país (x_sources.json)
       - Scrapea cada cuenta
       - Añade solo tweets nuevos al STORE
@@ -268,22 +452,24 @@ async def scrape_x_job(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
     chat_id = message.chat_id
 
-    # Eliminar jobs anteriores para ese país (si los hubiera)
+    # Eliminar jobs anteriores para ese país (si los hubiera); una ejecución en curso
+    # de la generación anterior ya no se reprogramará
     job_name = f"scrape_x_job_{country}"
     for job in context.job_queue.get_jobs_by_name(job_name):
         job.schedule_removal()
+    gen = _JOB_GEN[job_name] = _JOB_GEN.get(job_name, 0) + 1
 
-    # Programar job cada 600 segundos (10 minutos)
-    context.job_queue.run_repeating(
+    # Primera ejecución inmediata; el callback se reprograma con intervalo adaptativo
+    context.job_queue.run_once(
         scrape_x_job_callback,
-        interval=600,
-        first=0,
+        when=0,
         chat_id=chat_id,
         name=job_name,
-        data={"country": country, "limit": limit},
+        data={"country": country, "limit": limit, "interval": X_JOB_INTERVAL, "gen": gen},
     )
 
     await message.reply_text(
         f"✅ Job /scrape_x_job configurado para {country} cada 10 minutos "
-        f"(limit={limit})."
-    )
\ No newline at end of file
+        f"(se ajusta entre {X_JOB_MIN_INTERVAL // 60} y {X_JOB_MAX_INTERVAL // 60} min según actividad; "
+        f"limit={limit})."
+    )
@@ -1,8 +1,15 @@
 # botapp/handlers/sicu_ai.py
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
 import csv
+from datetime import date, timedelta
 from typing import List, Dict
 
 from telegram import Update, InputFile
@@ -10,79 +17,367 @@ from telegram.ext import ContextTypes
 
 from botapp.config import get_settings
 from botapp.utils.incidentes_csv import _slugify_country
-from botapp.handlers.sicu_full import CATEG_BASE_DIR  # reutilizamos misma ruta
-from botapp.services.llm_client import generate_sicu_analysis
+from botapp.handlers.sicu_full import CATEG_BASE_DIR, AUTO_SICU_COUNTRIES  # reutilizamos misma ruta
+from botapp.services.llm_client import (
+    SICU_BATCH_POLL_S,
+    collect_sicu_batch,
+    generate_sicu_analysis,
+    submit_sicu_batch,
+)
 
 SET = get_settings()
 
+# Informes IA ya generados, por hash de (CSV, país, día): repetir /sicu_ai no vuelve a llamar al modelo
+AI_CACHE_DIR = CATEG_BASE_DIR / ".ai_cache"
+_NOCACHE_TOKENS = {"nocache", "--nocache"}
+
+# Batches de OpenAI enviados y aún sin recoger: sobreviven a reinicios del bot
+PENDING_BATCHES = AI_CACHE_DIR / "pending_batches.json"
+COLLECT_JOB_NAME = "sicu_ai_collect"
+_PENDING_LOCK: asyncio.Lock | None = None
+
+# Telegram admite 4096 caracteres por mensaje; por encima de DOC_THRESHOLD se envía como TXT
+MSG_LIMIT = 4000
+DOC_THRESHOLD = 40_000
+
+# /sicu_ai con rango de fechas: días analizados a la vez y tamaño máximo del rango
+SICU_AI_CONCURRENCY = 5
+SICU_AI_MAX_DAYS = 31
+
+
+def _split_paragraphs(text: str, limit: int) -> List[str]:
+    """Trocea por párrafos (líneas en blanco) sin superar `limit` caracteres por trozo."""
+    parts: List[str] = []
+    cur = ""
+    for para in text.split("\n\n"):
+        while len(para) > limit:  # párrafo gigante: corte duro
+            if cur:
+                parts.append(cur)
+                cur = ""
+            parts.append(para[:limit])
+            para = para[limit:]
+        candidate = f"{cur}\n\n{para}" if cur else para
+        if len(candidate) > limit:
+            parts.append(cur)
+            cur = para
+        else:
+            cur = candidate
+    if cur.strip():
+        parts.append(cur)
+    return parts
+
+
+def _is_error(text: str) -> bool:
+    """Respuestas que no se cachean ni se tratan como informe: vacías o marcadas con ❌."""
+    return not text.strip() or text.lstrip().startswith("❌")
+
+
+def _ai_cache_file(csv_path: Path, country_slug: str, day: str) -> Path:
+    h = hashlib.blake2b(csv_path.read_bytes(), digest_size=16)
+    h.update(f"|{country_slug}|{day}".encode("utf-8"))
+    return AI_CACHE_DIR / f"{h.hexdigest()}.txt"
+
+
+# Únicas columnas que usa el prompt: pais, lat y lon no aportan nada al análisis
+KEEP_COLS = ("categoria_sicu", "fecha", "hora", "localizacion", "descripcion", "fuente_URL")
+
+
+def _read_incidents(csv_path: Path) -> List[Dict[str, str]]:
+    # csv.reader + índices: solo se materializan las columnas de KEEP_COLS
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return []
+        pos = {name: i for i, name in enumerate(header)}
+        idxs = [(k, pos.get(k)) for k in KEEP_COLS]
+        out: List[Dict[str, str]] = []
+        for r in reader:
+            if not r:
+                continue
+            n = len(r)
+            out.append({k: (r[i] if i is not None and i < n else "") for k, i in idxs})
+        return out
+
+
+async def _analyze_one_day(raw_country: str, country_slug: str, day: str, use_cache: bool) -> tuple[str | None, str]:
+    """
+    Informe IA de un día. Devuelve (texto, "") o (None, motivo) si no se pudo generar.
+    """
+    csv_path = CATEG_BASE_DIR / country_slug / f"{country_slug}-{day}_incidentes_SICU.csv"
+    if not csv_path.exists():
+        return None, (
+            f"❌ No encuentro el CSV SICU para {raw_country.upper()} {day}.\n"
+            f"Busca: {csv_path}\n"
+            "Primero ejecuta /sicu_full para ese día."
+        )
+
+    cache_file = await asyncio.to_thread(_ai_cache_file, csv_path, country_slug, day)
+    if use_cache and cache_file.exists():
+        return await asyncio.to_thread(cache_file.read_text, encoding="utf-8"), ""
+
+    # Cargar incidentes del CSV (lectura en hilo para no bloquear el bot)
+    try:
+        incidents = await asyncio.to_thread(_read_incidents, csv_path)
+    except Exception as e:
+        return None, f"❌ Error leyendo CSV SICU ({day}): {e!r}"
+
+    if not incidents:
+        return None, f"ℹ️ El CSV SICU de {day} está vacío. No hay incidentes que analizar."
+
+    # Llamar a la IA
+    text = await generate_sicu_analysis(raw_country.upper(), day, incidents)
+
+    # Si el texto parece ser un mensaje de error (vacío o empieza por ❌), lo devolvemos como motivo
+    if _is_error(text):
+        return None, text or f"❌ El modelo no devolvió texto ({day})."
+
+    try:
+        AI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(cache_file.write_text, text, encoding="utf-8")
+    except Exception as e:
+        print(f"[sicu_ai] no se pudo guardar la caché IA: {e!r}")
+    return text, ""
+
+
+def _parse_days(spec: str) -> List[str]:
+    """'YYYY-MM-DD' o 'YYYY-MM-DD..YYYY-MM-DD' (inclusive) → lista de días ISO."""
+    if ".." not in spec:
+        return [spec]
+    a, b = spec.split("..", 1)
+    start, end = date.fromisoformat(a.strip()), date.fromisoformat(b.strip())
+    if end < start:
+        start, end = end, start
+    if (end - start).days >= SICU_AI_MAX_DAYS:
+        raise ValueError(f"máximo {SICU_AI_MAX_DAYS} días por rango")
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+async def _send_document(bot, chat_id: int, text: str, filename: str, caption: str) -> None:
+    await bot.send_document(
+        chat_id=chat_id,
+        document=InputFile(text.encode("utf-8"), filename=filename),
+        caption=caption,
+    )
+
 
 async def sicu_ai(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    /sicu_ai <pais> <YYYY-MM-DD>
+    /sicu_ai <pais> <YYYY-MM-DD | YYYY-MM-DD..YYYY-MM-DD> [nocache]
 
     Usa el CSV de incidentes SICU (ya deduplicado) para generar un informe analítico
     mediante ChatGPT y devuelve el texto.
+    Con un rango de fechas se analizan los días en paralelo y se envía un único TXT.
+    Si el CSV no ha cambiado se reutiliza el informe anterior (salvo con `nocache`).
     """
     message = update.message or update.effective_message
     args = context.args or []
+    use_cache = not any(a.lower() in _NOCACHE_TOKENS for a in args)
+    args = [a for a in args if a.lower() not in _NOCACHE_TOKENS]
 
     if len(args) < 2:
         return await message.reply_text(
-            "Uso: /sicu_ai <pais> <YYYY-MM-DD>\n"
-            "Ejemplo: /sicu_ai haiti 2025-11-25\n\n"
+            "Uso: /sicu_ai <pais> <YYYY-MM-DD | YYYY-MM-DD..YYYY-MM-DD> [nocache]\n"
+            "Ejemplo: /sicu_ai haiti 2025-11-25\n"
+            "Rango:   /sicu_ai haiti 2025-11-19..2025-11-25\n\n"
             "Nota: primero ejecuta /sicu_full para ese día, para que exista el CSV SICU."
         )
 
     raw_country = args[0].strip()
-    day = args[1].strip()
     country_slug = _load_slug(raw_country)
+    try:
+        days = _parse_days(args[1].strip())
+    except ValueError as e:
+        return await message.reply_text(f"❌ Rango de fechas inválido: {e}")
 
-    csv_path = CATEG_BASE_DIR / country_slug / f"{country_slug}-{day}_incidentes_SICU.csv"
-    if not csv_path.exists():
-        return await message.reply_text(
-            f"❌ No encuentro el CSV SICU para {raw_country.upper()} {day}.\n"
-            f"Busca: {csv_path}\n"
-            "Primero ejecuta /sicu_full para ese día."
+    if len(days) == 1:
+        day = days[0]
+        await message.reply_text(
+            f"⏳ Generando informe analítico para {raw_country.upper()} {day} con ayuda de IA…"
         )
+        text, error = await _analyze_one_day(raw_country, country_slug, day, use_cache)
+        if text is None:
+            return await message.reply_text(error)
 
-    # Cargar incidentes del CSV
-    incidents: List[Dict[str, str]] = []
-    try:
-        with csv_path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                incidents.append(dict(row))
-    except Exception as e:
-        return await message.reply_text(f"❌ Error leyendo CSV SICU: {e!r}")
+        caption = f"📄 Informe analítico SICU (IA) :: {raw_country.upper()} {day}"
 
-    if not incidents:
-        return await message.reply_text("ℹ️ El CSV SICU está vacío. No hay incidentes que analizar.")
+        # Caso habitual: cabe en uno o pocos mensajes → texto directo, sin subir un fichero
+        if len(text) <= DOC_THRESHOLD:
+            for part in _split_paragraphs(f"{caption}\n\n{text}", MSG_LIMIT):
+                await message.reply_text(part)
+            return
+
+        # Informes muy largos: documento TXT para que puedas abrirlo/adjuntarlo fácilmente
+        return await _send_document(context.bot, message.chat_id, text, f"{country_slug}-{day}_SICU_AI.txt", caption)
 
+    # Rango: días en paralelo (lectura CSV + llamada IA son E/S), acotado por semáforo
     await message.reply_text(
-        f"⏳ Generando informe analítico para {raw_country.upper()} {day} con ayuda de IA…"
+        f"⏳ Generando {len(days)} informes analíticos para {raw_country.upper()} "
+        f"{days[0]}..{days[-1]} con ayuda de IA…"
     )
+    sem = asyncio.Semaphore(SICU_AI_CONCURRENCY)
 
-    # Llamar a la IA
-    text = await generate_sicu_analysis(raw_country.upper(), day, incidents)
+    async def one(day: str) -> tuple[str | None, str]:
+        async with sem:
+            return await _analyze_one_day(raw_country, country_slug, day, use_cache)
 
-    # Si el texto parece ser un mensaje de error (empieza por ❌), lo mandamos tal cual
-    if text.strip().startswith("❌"):
-        return await message.reply_text(text)
-
-    # Enviar como documento TXT para que puedas abrirlo/adjuntarlo fácilmente
-    from io import BytesIO
-    buf = BytesIO()
-    buf.write(text.encode("utf-8"))
-    buf.seek(0)
-
-    filename = f"{country_slug}-{day}_SICU_AI.txt"
-    await message.bot.send_document(
-        chat_id=message.chat_id,
-        document=InputFile(buf, filename=filename),
-        caption=f"📄 Informe analítico SICU (IA) :: {raw_country.upper()} {day}"
-    )
+    results = await asyncio.gather(*(one(d) for d in days))
+
+    blocks: List[str] = []
+    failed = 0
+    for day, (text, error) in zip(days, results):
+        blocks.append(f"===== {raw_country.upper()} :: {day} =====\n\n{text if text is not None else error}\n")
+        failed += text is None
+    if failed == len(days):
+        # Un error por día (~200 caracteres) × hasta 31 días supera el límite de Telegram: se trocea
+        errors = "\n\n".join(f"{day}: {err}" for day, (_, err) in zip(days, results))
+        for part in _split_paragraphs(f"❌ Ningún día del rango tiene informe:\n\n{errors}", MSG_LIMIT):
+            await message.reply_text(part)
+        return
+
+    caption = f"📄 Informe analítico SICU (IA) :: {raw_country.upper()} {days[0]}..{days[-1]}"
+    if failed:
+        caption += f" ({failed} días sin informe)"
+    await _send_document(context.bot, message.chat_id, "\n".join(blocks), f"{country_slug}-{days[0]}_{days[-1]}_SICU_AI.txt", caption)
+
+
+def _get_pending_lock() -> asyncio.Lock:
+    """Serializa lectura → cambio → escritura de pending_batches.json entre jobs."""
+    global _PENDING_LOCK
+    if _PENDING_LOCK is None:
+        _PENDING_LOCK = asyncio.Lock()
+    return _PENDING_LOCK
+
+
+def _load_pending() -> List[Dict]:
+    try:
+        return json.loads(PENDING_BATCHES.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"[sicu_ai_job] pending_batches.json ilegible: {e!r}")
+        return []
+
+
+def _save_pending(pending: List[Dict]) -> None:
+    AI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = PENDING_BATCHES.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(pending, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, PENDING_BATCHES)
+
+
+async def _deliver_batch(bot, entry: Dict, texts: List[str]) -> None:
+    """Guarda en la caché IA y envía al chat los informes de un batch terminado."""
+    for item, text in zip(entry["items"], texts):
+        if _is_error(text):
+            print(f"[sicu_ai_job] {item['country']} {item['day']}: {text!r}")
+            continue
+        try:
+            AI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(Path(item["cache_file"]).write_text, text, encoding="utf-8")
+        except Exception as e:
+            print(f"[sicu_ai_job] no se pudo guardar la caché IA: {e!r}")
+        try:
+            await _send_document(
+                bot,
+                entry["chat_id"],
+                text,
+                f"{item['slug']}-{item['day']}_SICU_AI.txt",
+                f"📄 Informe analítico SICU (IA) :: {item['country']} {item['day']}",
+            )
+        except Exception as e:
+            print(f"[sicu_ai_job] Error enviando {item['country']}: {e!r}")
+
+
+async def _collect_pending(bot) -> int:
+    """Recoge los batches terminados; devuelve cuántos siguen pendientes."""
+    async with _get_pending_lock():
+        pending = await asyncio.to_thread(_load_pending)
+        still: List[Dict] = []
+        for entry in pending:
+            texts = await collect_sicu_batch(entry["id"], len(entry["items"]), entry["submitted"])
+            if texts is None:
+                still.append(entry)
+                continue
+            await _deliver_batch(bot, entry, texts)
+        if still != pending:
+            await asyncio.to_thread(_save_pending, still)
+        return len(still)
+
+
+def _schedule_collect(job_queue) -> None:
+    # Una sola cadena de recogida: no se programa si ya hay una en cola
+    if job_queue is not None and not job_queue.get_jobs_by_name(COLLECT_JOB_NAME):
+        job_queue.run_once(sicu_ai_collect_job, when=SICU_BATCH_POLL_S, name=COLLECT_JOB_NAME)
+
+
+async def sicu_ai_collect_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Job que recoge los batches pendientes (pending_batches.json) y se reprograma
+    cada SICU_BATCH_POLL_S mientras quede alguno. Programado también al arrancar el bot,
+    para recuperar los batches enviados antes de un reinicio.
+    """
+    remaining = 1
+    try:
+        remaining = await _collect_pending(context.bot)
+    except Exception as e:
+        print(f"[sicu_ai_job] error recogiendo batches: {e!r}")
+    finally:
+        if remaining:
+            _schedule_collect(context.job_queue)
+
+
+async def sicu_ai_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Job programado (sin Update): informes IA del día para AUTO_SICU_COUNTRIES.
+    Envía todos los días/países pendientes en un único batch de OpenAI (mitad de precio)
+    y vuelve enseguida: el id del batch se guarda en pending_batches.json y
+    sicu_ai_collect_job entrega los informes cuando termina. Los resultados quedan
+    en la caché IA, así que un /sicu_ai posterior es instantáneo.
+    """
+    chat_id = context.job.chat_id
+    day = date.today().isoformat()
+
+    async with _get_pending_lock():
+        pending = await asyncio.to_thread(_load_pending)
+    in_flight = {item["cache_file"] for entry in pending for item in entry["items"]}
+
+    jobs: List[Dict] = []
+    items: List[Dict] = []
+    for country in AUTO_SICU_COUNTRIES:
+        slug = _load_slug(country)
+        csv_path = CATEG_BASE_DIR / slug / f"{slug}-{day}_incidentes_SICU.csv"
+        if not csv_path.exists():
+            continue
+        cache_file = await asyncio.to_thread(_ai_cache_file, csv_path, slug, day)
+        if cache_file.exists() or str(cache_file) in in_flight:
+            continue
+        try:
+            incidents = await asyncio.to_thread(_read_incidents, csv_path)
+        except Exception as e:
+            print(f"[sicu_ai_job] Error leyendo {csv_path}: {e!r}")
+            continue
+        if incidents:
+            jobs.append({"country": country.upper(), "day": day, "incidents": incidents})
+            items.append({"country": country.upper(), "day": day, "slug": slug, "cache_file": str(cache_file)})
+
+    if not jobs:
+        return
+
+    batch_id, error = await submit_sicu_batch(jobs)
+    if batch_id is None:
+        print(f"[sicu_ai_job] {error}")
+        return
+
+    async with _get_pending_lock():
+        pending = await asyncio.to_thread(_load_pending)
+        pending.append({"id": batch_id, "submitted": time.time(), "chat_id": chat_id, "items": items})
+        await asyncio.to_thread(_save_pending, pending)
+    print(f"[sicu_ai_job] batch {batch_id} enviado ({len(jobs)} informes)")
+    _schedule_collect(context.job_queue)
 
 
+@lru_cache(maxsize=64)
 def _load_slug(raw_country: str) -> str:
     # reutilizamos el helper de sicu_full
     return _slugify_country(raw_country)
\ No newline at end of file
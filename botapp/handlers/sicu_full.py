@@ -2,14 +2,28 @@
 # botapp/handlers/sicu_full.py
 from __future__ import annotations
 
+import asyncio
+import heapq
+import io
+import json
+import os
+import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
 import csv
 from collections import defaultdict, Counter
-from difflib import SequenceMatcher  # para similitud de descripciones
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from difflib import SequenceMatcher  # para similitud de descripciones (fallback)
 
-from telegram import Update, InputFile
+try:  # opcional: ratio en C++ mucho más rápido que difflib
+    from rapidfuzz import fuzz, process
+except ImportError:  # pragma: no cover - depende del entorno
+    fuzz = process = None
+
+from telegram import Update, InputFile, InputMediaDocument
 from telegram.ext import ContextTypes
 
 from botapp.config import get_settings
@@ -27,14 +41,48 @@ CATEG_BASE_DIR = OUTPUT_DIR / "incidentes_categorizados"
 
 # Países para la automatización (ajusta la lista a tu gusto)
 AUTO_SICU_COUNTRIES = ["libia", "haiti", "gaza", "colombia", "campello", "mali"]
+# Países procesados a la vez por sicu_full_job
+SICU_JOB_CONCURRENCY = 3
+# Documentos de un pipeline completo: TXT, CSV incidentes, CSV SICU, TXT SICU, informe, KML
+SICU_ARTIFACTS = 6
+
+# Ingest + geocodificación de pendientes de un país cada vez: resolve_missing_coords recorre
+# la lista global de pendientes, y en paralelo se geocodificarían las mismas filas varias veces
+# saltándose el límite de 1 req/s de Nominatim.
+_INGEST_LOCK: asyncio.Lock | None = None
+
+
+def _get_ingest_lock() -> asyncio.Lock:
+    global _INGEST_LOCK
+    if _INGEST_LOCK is None:
+        _INGEST_LOCK = asyncio.Lock()
+    return _INGEST_LOCK
+
 
+# Deduplicación: a partir de este tamaño de grupo se calcula la matriz de similitud
+# completa (rapidfuzz.process.cdist); el tope evita matrices N×N enormes en memoria.
+DEDUP_MATRIX_MIN = 64
+DEDUP_MATRIX_MAX = 4000
 
+
+@lru_cache(maxsize=64)
 def _country_dir(country: str) -> Path:
     d = DATA_DIR / country.lower()
     d.mkdir(parents=True, exist_ok=True)
     return d
 
 
+@lru_cache(maxsize=64)
+def _country_slug(raw_country: str) -> str:
+    return _slugify_country(raw_country)
+
+
+@lru_cache(maxsize=64)
+def _sicu_dirs(country_slug: str) -> tuple[Path, Path]:
+    """(carpeta CSV/TXT SICU, carpeta de informes) de un país."""
+    return CATEG_BASE_DIR / country_slug, OUTPUT_DIR / "sicu_reports" / country_slug
+
+
 def _group_by_category(items: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     grouped: Dict[str, List[Dict[str, Any]]] = {}
     for it in items:
@@ -42,9 +90,26 @@ def _group_by_category(items: List[Dict[str, Any]]) -> Dict[str, List[Dict[str,
     return grouped
 
 
+def _top_locs(loc_counts: Counter, k: int = 3) -> str:
+    """'loc (n), ...' de las k localizaciones más frecuentes (heap parcial, sin ordenar todo)."""
+    return ", ".join(f"{loc} ({n})" for loc, n in heapq.nlargest(k, loc_counts.items(), key=itemgetter(1)))
+
+
+@lru_cache(maxsize=4096)
+def _key_part(value: str) -> str:
+    """
+    Componente normalizado e internado de la clave de deduplicación: país, categoría,
+    fecha y localización se repiten en miles de filas, así que cada valor distinto se
+    normaliza una vez y las tuplas clave comparan por identidad.
+    """
+    return sys.intern(value.strip().lower())
+
+
+@lru_cache(maxsize=2048)
 def _parse_time_to_minutes(hora: str) -> int | None:
     """
     Convierte 'HH:MM' a minutos desde medianoche. Devuelve None si no es válida.
+    Memoizada: en un día hay como mucho 1440 horas distintas y se repiten mucho.
     """
     hora = (hora or "").strip()
     if not hora:
@@ -60,15 +125,65 @@ def _parse_time_to_minutes(hora: str) -> int | None:
 
 def _similarity(a: str, b: str) -> float:
     """
-    Similaridad simple entre dos textos (0.0–1.0) usando difflib.
+    Similaridad simple entre dos textos (0.0–1.0): rapidfuzz si está instalado, si no difflib.
     """
-    a = (a or "").strip().lower()
-    b = (b or "").strip().lower()
+    return _ratio((a or "").strip().lower(), (b or "").strip().lower())
+
+
+def _ratio(a: str, b: str) -> float:
+    """Como _similarity, pero con textos ya normalizados (strip + lower)."""
     if not a or not b:
         return 0.0
+    if fuzz is not None:
+        return fuzz.ratio(a, b) / 100.0
     return SequenceMatcher(None, a, b).ratio()
 
 
+@dataclass(slots=True)
+class _DedupRow:
+    """Fila SICU con los campos de comparación ya normalizados (slots: sin __dict__)."""
+    row: Dict[str, Any]
+    desc_norm: str
+    t_min: int | None
+
+
+def _same_incident(a: _DedupRow, b: _DedupRow) -> bool:
+    """Criterio de fusión entre dos filas: descripción ≥ 0.75 y, si ambas tienen hora, ±120 min."""
+    if not a.desc_norm or not b.desc_norm:
+        return False
+    if a.t_min is not None and b.t_min is not None and abs(a.t_min - b.t_min) > 120:
+        return False
+    return _ratio(a.desc_norm, b.desc_norm) >= 0.75
+
+
+def _merge_cluster(cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fusiona las filas de un cluster en una sola (fuentes sin duplicados, primera lat/lon)."""
+    base = dict(cluster[0])  # copiar primera como base
+
+    # Fusionar fuentes (sin duplicados, en orden de aparición)
+    fuentes = list(dict.fromkeys(
+        f for r in cluster if (f := (r.get("fuente_URL") or r.get("fuente") or "").strip())
+    ))
+    if fuentes:
+        base["fuente_URL"] = " | ".join(fuentes)
+
+    # Fusionar lat/lon: primera no vacía
+    if not (base.get("lat") or "").strip():
+        for r in cluster:
+            lat = (r.get("lat") or "").strip()
+            if lat:
+                base["lat"] = lat
+                break
+    if not (base.get("lon") or "").strip():
+        for r in cluster:
+            lon = (r.get("lon") or "").strip()
+            if lon:
+                base["lon"] = lon
+                break
+
+    return base
+
+
 def deduplicate_sicu_incidents(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Deduplica incidentes SICU combinando filas muy similares dentro de la misma clave
@@ -82,93 +197,179 @@ def deduplicate_sicu_incidents(rows: List[Dict[str, Any]]) -> List[Dict[str, Any
       - fuente_URL: concatena todas las fuentes sin duplicados (separadas por " | ").
       - lat/lon: usa la primera no vacía encontrada.
     """
-    grouped: Dict[tuple[str, str, str, str], List[Dict[str, Any]]] = {}
+    if not rows:
+        return []
 
+    # Una sola pasada: clave de grupo + descripción/hora normalizadas de cada fila.
+    # El bucle de comparación solo lee atributos ya listos.
+    grouped: Dict[tuple[str, str, str, str], List[_DedupRow]] = {}
     for r in rows:
-        pais = (r.get("pais") or "").strip().lower()
-        cat = (r.get("categoria_sicu") or "").strip().lower()
-        fecha = (r.get("fecha") or "").strip()
-        loc = (r.get("localizacion") or "").strip().lower()
-        key = (pais, cat, fecha, loc)
-        grouped.setdefault(key, []).append(r)
+        key = (
+            _key_part(r.get("pais") or ""),
+            _key_part(r.get("categoria_sicu") or ""),
+            _key_part(r.get("fecha") or ""),
+            _key_part(r.get("localizacion") or ""),
+        )
+        grouped.setdefault(key, []).append(_DedupRow(
+            r, (r.get("descripcion") or "").strip().lower(), _parse_time_to_minutes(r.get("hora") or ""),
+        ))
 
     deduped: List[Dict[str, Any]] = []
 
-    for key, items in grouped.items():
-        clusters: List[List[Dict[str, Any]]] = []
-
-        for row in items:
-            desc = (row.get("descripcion") or "").strip()
-            t_min = _parse_time_to_minutes(row.get("hora") or "")
-            placed = False
-
-            for cluster in clusters:
-                rep = cluster[0]
-                rep_desc = (rep.get("descripcion") or "").strip()
-                sim = _similarity(desc, rep_desc)
-                if sim < 0.75:
-                    continue
+    for prepped in grouped.values():
+        # Vía rápida: la mayoría de grupos (pais, cat, fecha, loc) tienen 1 o 2 filas
+        if len(prepped) == 1:
+            deduped.append(prepped[0].row)
+            continue
+        if len(prepped) == 2:
+            a, b = prepped
+            if _same_incident(a, b):
+                deduped.append(_merge_cluster([a.row, b.row]))
+            else:
+                deduped.extend((a.row, b.row))
+            continue
 
-                rep_t_min = _parse_time_to_minutes(rep.get("hora") or "")
+        clusters: List[List[Dict[str, Any]]] = []
+        rep_descs: List[str] = []  # descripción normalizada del representante de cada cluster
+        rep_tmins: List[int | None] = []  # hora (min) del representante de cada cluster
+        rep_rows: List[int] = []  # índice en `prepped` del representante de cada cluster
+
+        # Grupos grandes: matriz de similitud completa en una sola llamada C multihilo
+        sim = None
+        if process is not None and DEDUP_MATRIX_MIN <= len(prepped) <= DEDUP_MATRIX_MAX:
+            descs = [p.desc_norm for p in prepped]
+            sim = process.cdist(descs, descs, scorer=fuzz.ratio, score_cutoff=75, workers=-1)
+
+        for pos, item in enumerate(prepped):
+            row, desc_norm, t_min = item.row, item.desc_norm, item.t_min
+            if not desc_norm:
+                candidates: List[int] = []
+            elif sim is not None:
+                sim_row = sim[pos]
+                candidates = [i for i, r in enumerate(rep_rows) if sim_row[r] >= 75]
+            elif process is not None:
+                # Una sola llamada en C contra todos los representantes; se respeta
+                # el orden de los clusters para elegir el mismo que el bucle original.
+                hits = process.extract(
+                    desc_norm, rep_descs, scorer=fuzz.ratio, score_cutoff=75, limit=None,
+                )
+                candidates = sorted(h[2] for h in hits)
+            else:
+                # Cota superior del ratio: 2·min(la, lb)/(la + lb). Si ya queda por debajo
+                # de 0.75, ni se llama a SequenceMatcher.
+                la = len(desc_norm)
+                candidates = [
+                    i for i, rep in enumerate(rep_descs)
+                    if 2 * min(la, len(rep)) >= 0.75 * (la + len(rep)) and _ratio(desc_norm, rep) >= 0.75
+                ]
+
+            for idx in candidates:
+                rep_t_min = rep_tmins[idx]
                 # Si ambas horas son válidas, exigimos que estén razonablemente cerca
                 if t_min is not None and rep_t_min is not None:
                     if abs(t_min - rep_t_min) > 120:  # más de 2h de diferencia
                         continue
 
                 # Si llegamos aquí, consideramos que es el mismo incidente
-                cluster.append(row)
-                placed = True
+                clusters[idx].append(row)
                 break
-
-            if not placed:
+            else:
                 clusters.append([row])
+                rep_descs.append(desc_norm)
+                rep_tmins.append(t_min)
+                rep_rows.append(pos)
 
         # Fusionar cada cluster en una sola fila
         for cluster in clusters:
-            if len(cluster) == 1:
-                deduped.append(cluster[0])
-                continue
-
-            base = dict(cluster[0])  # copiar primera como base
-
-            # Fusionar fuentes
-            fuentes: List[str] = []
-            for r in cluster:
-                f = (r.get("fuente_URL") or r.get("fuente") or "").strip()
-                if f and f not in fuentes:
-                    fuentes.append(f)
-            if fuentes:
-                base["fuente_URL"] = " | ".join(fuentes)
-
-            # Fusionar lat/lon: primera no vacía
-            if not (base.get("lat") or "").strip():
-                for r in cluster:
-                    lat = (r.get("lat") or "").strip()
-                    if lat:
-                        base["lat"] = lat
-                        break
-            if not (base.get("lon") or "").strip():
-                for r in cluster:
-                    lon = (r.get("lon") or "").strip()
-                    if lon:
-                        base["lon"] = lon
-                        break
-
-            deduped.append(base)
+            deduped.append(cluster[0] if len(cluster) == 1 else _merge_cluster(cluster))
 
     return deduped
 
 
-def _build_sicu_report_txt(
+# Plantilla fija del informe SICU: encabezado + meteorología (se rellena con .format)
+SICU_REPORT_HEADER = """\
+🧱 INFORME SICU – VERSIÓN AUTOMÁTICA
+⸻
+0. ENCABEZADO
+\t•\tPaís / Área SRM: {pais} / {area_srm}
+\t•\tFecha (día operativo): {fecha_op}
+\t•\tHora de edición: {hora_edicion}
+\t•\tUnidad emisora: SANTIAGOLEGALCONSULTING – Unidad de Análisis SICU
+\t•\tFuentes abiertas + incidentes SICU del día
+
+⸻
+🌤 METEOROLOGÍA
+
+(OWM / AEMET según país)
+\t•\tTemp / ST: [por integrar]
+\t•\tViento: [por integrar]
+\t•\tPresión: [por integrar]
+\t•\tVisibilidad: [por integrar]
+\t•\tNubosidad: [por integrar]
+\t•\tProbabilidad precipitación: [por integrar]
+\t•\tMini-pronóstico 6–12 h: [por integrar]
+\t•\tImpacto operativo: [pendiente de análisis específico]
+"""
+
+# Secciones 4–6 del informe SICU: estructura fija para completar a mano
+SICU_REPORT_FOOTER = """\
+⸻
+4. AVIACIÓN, MOVILIDAD Y CAMBIO
+
+Aviación:
+\t• Estado de aeropuertos / helipuertos / corredores aéreos: [por integrar]
+\t• NOTAM relevantes: [por integrar]
+\t• Actividad aérea militar (UAV, artillería, jets): [por integrar]
+\t• Impacto meteorológico en vuelos / evacuaciones: [por integrar]
+
+Movilidad:
+\t• MSR activas / cerradas: [por integrar]
+\t• Chequeos, bloqueos, focos de violencia: [por integrar]
+\t• Riesgos de convoyes (UXO/MUSE, bandas, facciones armadas): [por integrar]
+\t• Corredores recomendados: [por integrar]
+\t• Zonas a restringir o prohibir: [por integrar]
+
+Cambio (Exchange / Mercado Negro / Liquidez):
+\t• Cambio oficial del país → USD y EUR: [por integrar]
+\t• Cambio real de calle / mercado negro: [por integrar]
+\t• Disponibilidad de efectivo / colapsos bancarios / restricciones: [por integrar]
+\t• Impacto operativo: coste para convoyes, capacidad de compra de personal ONU/INGO, inflación y deterioro económico local.
+
+⸻
+5. SITUACIÓN MISIÓN ONU / AUTORIDADES / FUERZA MULTINACIONAL
+\t• Postura de seguridad UNDSS / SIOC: [por integrar]
+\t• Riesgos para instalaciones y personal ONU: [por integrar]
+\t• Estado del despliegue multinacional (ISF, BINUH, MINUSMA, etc.): [por integrar]
+\t• Decisiones recientes del CSNU / Gobierno / Alianzas: [por integrar]
+\t• Actividad hostil contra personal ONU o INGO: [por integrar]
+\t• Cambios en reglas de movimiento / niveles de alerta: [por integrar]
+\t• Evaluación estratégica del día: [por integrar]
+
+⸻
+6. RECOMENDACIONES
+
+6.1 Seguridad y Movilidad
+\t• [Por completar manualmente]
+
+6.2 Humanitario / Hazards
+\t• [Por completar manualmente]
+
+6.3 Marco Político–Estratégico / ONU / Fuerza Multinacional
+\t• [Por completar manualmente]
+"""
+
+
+def _iter_sicu_report_lines(
     raw_country: str,
     country_slug: str,
     day: str,
     filtrados: List[Dict[str, Any]],
-) -> str:
+) -> Iterator[str]:
     """
-    Construye el INFORME SICU TXT siguiendo la plantilla definitiva.
+    Genera el INFORME SICU TXT (líneas ya con su salto) siguiendo la plantilla definitiva.
     Usa los incidentes SICU ya filtrados (sin 'Otros').
     Esta versión *no utiliza LLM*, solo integra datos.
+    Generador: el informe se escribe a disco sin montarlo entero en memoria.
     """
     pais = raw_country.upper()
     area_srm = country_slug.capitalize()
@@ -189,76 +390,54 @@ def _build_sicu_report_txt(
         "Disturbios Civiles",
         "Hazards",
     ]
+    # Nº de incidentes por categoría, calculado una vez para las secciones 1 y 3
+    n_by_cat = {cat: len(by_cat.get(cat, ())) for cat in cat_order}
 
-    lines: List[str] = []
-
-    # 0. ENCABEZADO
-    lines.append("🧱 INFORME SICU – VERSIÓN AUTOMÁTICA")
-    lines.append("⸻")
-    lines.append("0. ENCABEZADO")
-    lines.append(f"\t•\tPaís / Área SRM: {pais} / {area_srm}")
-    lines.append(f"\t•\tFecha (día operativo): {fecha_op}")
-    lines.append(f"\t•\tHora de edición: {hora_edicion}")
-    lines.append("\t•\tUnidad emisora: SANTIAGOLEGALCONSULTING – Unidad de Análisis SICU")
-    lines.append("\t•\tFuentes abiertas + incidentes SICU del día")
-    lines.append("")
-
-    # METEOROLOGÍA (estructura para rellenar después)
-    lines.append("⸻")
-    lines.append("🌤 METEOROLOGÍA")
-    lines.append("")
-    lines.append("(OWM / AEMET según país)")
-    lines.append("\t•\tTemp / ST: [por integrar]")
-    lines.append("\t•\tViento: [por integrar]")
-    lines.append("\t•\tPresión: [por integrar]")
-    lines.append("\t•\tVisibilidad: [por integrar]")
-    lines.append("\t•\tNubosidad: [por integrar]")
-    lines.append("\t•\tProbabilidad precipitación: [por integrar]")
-    lines.append("\t•\tMini-pronóstico 6–12 h: [por integrar]")
-    lines.append("\t•\tImpacto operativo: [pendiente de análisis específico]")
-    lines.append("")
+    # 0. ENCABEZADO + METEOROLOGÍA (plantilla fija)
+    yield SICU_REPORT_HEADER.format(
+        pais=pais, area_srm=area_srm, fecha_op=fecha_op, hora_edicion=hora_edicion,
+    ) + "\n"
 
     # 1. RESUMEN EJECUTIVO – datos básicos solamente
-    lines.append("⸻")
-    lines.append("1. RESUMEN EJECUTIVO")
-    lines.append("")
-    lines.append(f"(Día operativo {fecha_op} – total incidentes SICU: {total})")
-    lines.append("")
-    for cat in cat_order:
-        n = len(by_cat.get(cat, []))
+    yield "⸻\n"
+    yield "1. RESUMEN EJECUTIVO\n"
+    yield "\n"
+    yield f"(Día operativo {fecha_op} – total incidentes SICU: {total})\n"
+    yield "\n"
+    for cat, n in n_by_cat.items():
         if n:
-            lines.append(f"• {cat}: {n} incidente(s) registrado(s).")
-    lines.append("")
-    lines.append("➤ Análisis cualitativo: [Por integrar manualmente]")
-    lines.append("")
+            yield f"• {cat}: {n} incidente(s) registrado(s).\n"
+    yield "\n"
+    yield "➤ Análisis cualitativo: [Por integrar manualmente]\n"
+    yield "\n"
 
     # 2. DESGLOSE DE EVENTOS POR CATEGORÍAS SICU
-    lines.append("⸻")
-    lines.append("2. DESGLOSE DE EVENTOS POR CATEGORÍAS SICU")
-    lines.append("")
-    lines.append("(En cada subapartado se añade: Descripción general + incidentes con formato obligatorio)")
-    lines.append("")
+    yield "⸻\n"
+    yield "2. DESGLOSE DE EVENTOS POR CATEGORÍAS SICU\n"
+    yield "\n"
+    yield "(En cada subapartado se añade: Descripción general + incidentes con formato obligatorio)\n"
+    yield "\n"
 
-    def add_section(cat_name: str, titulo: str):
+    def add_section(cat_name: str, titulo: str) -> Iterator[str]:
         items = by_cat.get(cat_name, [])
-        lines.append("⸻")
-        lines.append(titulo)
-        lines.append("")
+        yield "⸻\n"
+        yield titulo + "\n"
+        yield "\n"
         if not items:
-            lines.append("\tNo se registraron incidentes en esta categoría durante el día operativo.")
-            lines.append("")
+            yield "\tNo se registraron incidentes en esta categoría durante el día operativo.\n"
+            yield "\n"
             return
 
         # Resumen automático de la categoría usando tus datos
         locs = [(it.get("localizacion") or "Localización no especificada") for it in items]
         loc_counts = Counter(locs)
-        top_locs = ", ".join(f"{loc} ({n})" for loc, n in loc_counts.most_common(3))
+        top_locs = _top_locs(loc_counts)
 
-        lines.append(f"\t• Incidentes registrados: {len(items)}")
+        yield f"\t• Incidentes registrados: {len(items)}\n"
         if top_locs:
-            lines.append(f"\t• Principales áreas afectadas: {top_locs}")
-        lines.append("\t• Descripción general: Ver bloque 1.")
-        lines.append("")
+            yield f"\t• Principales áreas afectadas: {top_locs}\n"
+        yield "\t• Descripción general: Ver bloque 1.\n"
+        yield "\n"
 
         for it in items:
             fecha_i = it.get("fecha", "")
@@ -266,87 +445,239 @@ def _build_sicu_report_txt(
             loc = it.get("localizacion") or "Localización no especificada"
             desc = (it.get("descripcion") or "").strip()
             fuente = (it.get("fuente_URL") or it.get("fuente") or "").strip()
-            lines.append(f"\t• Localización: {loc}")
-            lines.append(f"\t\tBreve descripción analítica: {desc}")
-            lines.append(f"\t\tFecha/Hora: {fecha_i} {hora_i}")
+            yield f"\t• Localización: {loc}\n"
+            yield f"\t\tBreve descripción analítica: {desc}\n"
+            yield f"\t\tFecha/Hora: {fecha_i} {hora_i}\n"
             if fuente:
-                lines.append(f"\t\tFuente: {fuente}")
-            lines.append("")
+                yield f"\t\tFuente: {fuente}\n"
+            yield "\n"
 
-    add_section("Terrorismo", "2.1. TERRORISMO")
-    add_section("Conflicto Armado", "2.2. CONFLICTO ARMADO")
-    add_section("Criminalidad", "2.3. CRIMINALIDAD")
-    add_section("Disturbios Civiles", "2.4. DISTURBIOS CIVILES")
-    add_section("Hazards", "2.5. HAZARDS")
+    yield from add_section("Terrorismo", "2.1. TERRORISMO")
+    yield from add_section("Conflicto Armado", "2.2. CONFLICTO ARMADO")
+    yield from add_section("Criminalidad", "2.3. CRIMINALIDAD")
+    yield from add_section("Disturbios Civiles", "2.4. DISTURBIOS CIVILES")
+    yield from add_section("Hazards", "2.5. HAZARDS")
 
     # 3. MAPA DE FOCOS Y PROYECCIÓN
-    lines.append("⸻")
-    lines.append("3. MAPA DE FOCOS (24 h) Y PROYECCIÓN 24–72 h")
-    lines.append("")
-    lines.append("Focos de hoy (24 h):")
-    for cat in cat_order:
-        n = len(by_cat.get(cat, []))
+    yield "⸻\n"
+    yield "3. MAPA DE FOCOS (24 h) Y PROYECCIÓN 24–72 h\n"
+    yield "\n"
+    yield "Focos de hoy (24 h):\n"
+    for cat, n in n_by_cat.items():
         if n:
-            areas = ", ".join({it.get("localizacion") or "localización no especificada"
-                                for it in by_cat[cat]})
-            lines.append(f"\t• {cat}: {n} foco(s) – principales áreas: {areas}")
-    if not any(len(by_cat.get(cat, [])) for cat in cat_order):
-        lines.append("\t• Sin focos SICU identificados en las últimas 24 h.")
-    lines.append("")
-    lines.append("Proyección 24–72 h: [Por integrar manualmente]")
-    lines.append("")
-
-    # 4. AVIACIÓN, MOVILIDAD Y CAMBIO
-    lines.append("⸻")
-    lines.append("4. AVIACIÓN, MOVILIDAD Y CAMBIO")
-    lines.append("")
-    lines.append("Aviación:")
-    lines.append("\t• Estado de aeropuertos / helipuertos / corredores aéreos: [por integrar]")
-    lines.append("\t• NOTAM relevantes: [por integrar]")
-    lines.append("\t• Actividad aérea militar (UAV, artillería, jets): [por integrar]")
-    lines.append("\t• Impacto meteorológico en vuelos / evacuaciones: [por integrar]")
-    lines.append("")
-    lines.append("Movilidad:")
-    lines.append("\t• MSR activas / cerradas: [por integrar]")
-    lines.append("\t• Chequeos, bloqueos, focos de violencia: [por integrar]")
-    lines.append("\t• Riesgos de convoyes (UXO/MUSE, bandas, facciones armadas): [por integrar]")
-    lines.append("\t• Corredores recomendados: [por integrar]")
-    lines.append("\t• Zonas a restringir o prohibir: [por integrar]")
-    lines.append("")
-    lines.append("Cambio (Exchange / Mercado Negro / Liquidez):")
-    lines.append("\t• Cambio oficial del país → USD y EUR: [por integrar]")
-    lines.append("\t• Cambio real de calle / mercado negro: [por integrar]")
-    lines.append("\t• Disponibilidad de efectivo / colapsos bancarios / restricciones: [por integrar]")
-    lines.append("\t• Impacto operativo: coste para convoyes, capacidad de compra de personal ONU/INGO, inflación y deterioro económico local.")
-    lines.append("")
-
-    # 5. SITUACIÓN MISIÓN ONU / AUTORIDADES / FUERZA MULTINACIONAL
-    lines.append("⸻")
-    lines.append("5. SITUACIÓN MISIÓN ONU / AUTORIDADES / FUERZA MULTINACIONAL")
-    lines.append("\t• Postura de seguridad UNDSS / SIOC: [por integrar]")
-    lines.append("\t• Riesgos para instalaciones y personal ONU: [por integrar]")
-    lines.append("\t• Estado del despliegue multinacional (ISF, BINUH, MINUSMA, etc.): [por integrar]")
-    lines.append("\t• Decisiones recientes del CSNU / Gobierno / Alianzas: [por integrar]")
-    lines.append("\t• Actividad hostil contra personal ONU o INGO: [por integrar]")
-    lines.append("\t• Cambios en reglas de movimiento / niveles de alerta: [por integrar]")
-    lines.append("\t• Evaluación estratégica del día: [por integrar]")
-    lines.append("")
-
-    # 6. RECOMENDACIONES
-    lines.append("⸻")
-    lines.append("6. RECOMENDACIONES")
-    lines.append("")
-    lines.append("6.1 Seguridad y Movilidad")
-    lines.append("\t• [Por completar manualmente]")
-    lines.append("")
-    lines.append("6.2 Humanitario / Hazards")
-    lines.append("\t• [Por completar manualmente]")
-    lines.append("")
-    lines.append("6.3 Marco Político–Estratégico / ONU / Fuerza Multinacional")
-    lines.append("\t• [Por completar manualmente]")
-    lines.append("")
-
-    return "\n".join(lines)
+            # dict.fromkeys: únicas y en orden de aparición (un set cambia de orden entre ejecuciones)
+            areas = ", ".join(dict.fromkeys(it.get("localizacion") or "localización no especificada"
+                                            for it in by_cat[cat]))
+            yield f"\t• {cat}: {n} foco(s) – principales áreas: {areas}\n"
+    if not any(n_by_cat.values()):
+        yield "\t• Sin focos SICU identificados en las últimas 24 h.\n"
+    yield "\n"
+    yield "Proyección 24–72 h: [Por integrar manualmente]\n"
+    yield "\n"
+
+    # 4–6. AVIACIÓN / MISIÓN ONU / RECOMENDACIONES (plantilla fija)
+    yield SICU_REPORT_FOOTER
+
+
+def _write_sicu_report(
+    path: Path,
+    raw_country: str,
+    country_slug: str,
+    day: str,
+    filtrados: List[Dict[str, Any]],
+) -> None:
+    # Volcado en streaming: solo vive una línea del informe a la vez
+    with path.open("w", encoding="utf-8", newline="") as f:
+        f.writelines(_iter_sicu_report_lines(raw_country, country_slug, day, filtrados))
+
+
+def _build_sicu_grouped_txt(filtrados: List[Dict[str, Any]]) -> str:
+    """TXT SICU agrupado por categoría (áreas principales + una línea por incidente)."""
+    grouped = _group_by_category(filtrados)
+    lines_txt: List[str] = []
+    lines_txt.append("Sucesos / Incidentes (Clasificación SICU)\n")
+    for cat in ("Conflicto Armado", "Terrorismo", "Criminalidad",
+                "Disturbios Civiles", "Hazards"):
+        items = grouped.get(cat, [])
+        if not items:
+            continue
+        loc_counts = Counter([it["localizacion"] or "Localización no especificada" for it in items])
+        top_locs = _top_locs(loc_counts)
+        lines_txt.append(f"{cat}:")
+        if top_locs:
+            lines_txt.append(f"  Áreas principales: {top_locs}")
+        for it in items:
+            desc = it["descripcion"]
+            loc = it["localizacion"] or "Localización no especificada"
+            fuente = it.get("fuente_URL") or ""
+            linea = f" - {desc} → {loc}"
+            if fuente:
+                linea += f" | Fuente: {fuente}"
+            lines_txt.append(linea)
+        lines_txt.append("")
+    return "\n".join(lines_txt)
+
+
+SICU_FIELDNAMES = ("fecha", "hora", "pais", "categoria_sicu",
+                   "descripcion", "localizacion", "lat", "lon", "fuente_URL")
+_sicu_row = itemgetter(*SICU_FIELDNAMES)
+
+
+def _build_sicu_csv(rows: List[Dict[str, Any]]) -> bytes:
+    # csv.writer + tuplas en orden fijo (DictWriter vuelve a recorrer fieldnames por fila).
+    # Se genera en memoria: los mismos bytes se escriben a disco y se envían.
+    buf = io.StringIO(newline="")
+    writer = csv.writer(buf)
+    writer.writerow(SICU_FIELDNAMES)
+    writer.writerows(map(_sicu_row, rows))
+    return buf.getvalue().encode("utf-8")
+
+
+# Campo normalizado → columnas aceptadas en el CSV de incidentes (la primera no vacía gana)
+_SICU_COLUMNS: Dict[str, tuple[str, ...]] = {
+    "fecha": ("fecha", "Fecha"),
+    "hora": ("hora", "Hora"),
+    "pais": ("pais", "Pais"),
+    "categoria_sicu": ("categoria_sicu", "Categoría SICU"),
+    "descripcion": ("descripcion", "Breve descripción"),
+    "localizacion": ("localizacion", "Localización"),
+    "lat": ("lat", "Lat"),
+    "lon": ("lon", "Lon"),
+    "fuente_URL": ("fuente", "Fuente_URL"),
+}
+
+
+def _read_sicu_rows(path: Path, day: str, country_slug: str) -> tuple[int, List[Dict[str, Any]]]:
+    """
+    Lee el CSV de incidentes con csv.reader (índices de columna resueltos una vez)
+    en columnas (una lista por campo) y solo crea dicts para las filas que se quedan:
+    homogeneiza nombres de columna y descarta 'Otros' / sin descripción.
+    Devuelve (filas leídas, filas SICU filtradas).
+    """
+    with path.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return 0, []
+        pos = {name: i for i, name in enumerate(header)}
+        idxs = {field: [pos[c] for c in aliases if c in pos] for field, aliases in _SICU_COLUMNS.items()}
+        cols: Dict[str, List[str]] = {field: [] for field in _SICU_COLUMNS}
+        total = 0
+        for r in reader:
+            if not r:
+                continue
+            total += 1
+            n = len(r)
+            for field, ii in idxs.items():
+                cols[field].append(next((r[i] for i in ii if i < n and r[i]), ""))
+
+    default_pais = country_slug.capitalize()
+    filtrados: List[Dict[str, Any]] = []
+    for k in range(total):
+        categoria_sicu = cols["categoria_sicu"][k] or "Otros"
+        cat = categoria_sicu.strip().lower()
+        descripcion = cols["descripcion"][k].strip()
+        if not cat or not descripcion or cat == "otros":
+            continue
+        # Categóricas internadas: pocos valores distintos repetidos en todas las filas
+        filtrados.append({
+            "fecha": sys.intern(cols["fecha"][k] or day),
+            "hora": cols["hora"][k],
+            "pais": sys.intern(cols["pais"][k] or default_pais),
+            "categoria_sicu": sys.intern(categoria_sicu),
+            "descripcion": descripcion,
+            "localizacion": cols["localizacion"][k].strip(),
+            "lat": cols["lat"][k].strip(),
+            "lon": cols["lon"][k].strip(),
+            "fuente_URL": cols["fuente_URL"][k].strip(),
+        })
+    return total, filtrados
+
+
+# (ruta, nombre, caption, bytes ya en memoria o None si hay que leerlos de disco)
+Artifact = tuple[Path, str, str, Optional[bytes]]
+
+
+async def _send_artifacts(bot, chat_id: int, artifacts: List[Artifact]) -> None:
+    """
+    Envía los documentos generados (ruta, nombre, caption) en UNA llamada (send_media_group,
+    máx. 10). Si Telegram rechaza el álbum (tamaño, etc.), los manda sueltos en paralelo.
+    Solo se leen de disco los que no traen ya sus bytes.
+    """
+    async def _read(path: Path, data: Optional[bytes]) -> bytes:
+        if data is not None:
+            return data
+        return await asyncio.to_thread(path.read_bytes)
+
+    try:
+        blobs = await asyncio.gather(*(_read(path, data) for path, _, _, data in artifacts))
+    except Exception as e:
+        await bot.send_message(chat_id=chat_id, text=f"⚠️ No se pudieron leer los ficheros generados: {e!r}")
+        return
+
+    if len(artifacts) >= 2:  # un álbum necesita entre 2 y 10 elementos
+        try:
+            for start in range(0, len(artifacts), 10):
+                await bot.send_media_group(
+                    chat_id=chat_id,
+                    media=[
+                        InputMediaDocument(media=data, filename=name, caption=caption)
+                        for (_, name, caption, _), data in zip(artifacts[start:start + 10], blobs[start:start + 10])
+                    ],
+                )
+            return
+        except Exception as e:
+            print(f"[sicu_full] send_media_group falló, se envían sueltos: {e!r}")
+
+    results = await asyncio.gather(
+        *(
+            bot.send_document(chat_id=chat_id, document=InputFile(data, filename=name), caption=caption)
+            for (_, name, caption, _), data in zip(artifacts, blobs)
+        ),
+        return_exceptions=True,
+    )
+    for (_, name, _, _), res in zip(artifacts, results):
+        if isinstance(res, Exception):
+            await bot.send_message(chat_id=chat_id, text=f"⚠️ {name} creado pero no enviado: {res!r}")
+
+
+def _txt_signature(txt_path: Path) -> List[int] | None:
+    try:
+        st = txt_path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _manifest_path(country_slug: str) -> Path:
+    return _sicu_dirs(country_slug)[1] / ".manifest.json"
+
+
+def _manifest_lookup(country_slug: str, day: str, sig: List[int]) -> List[Artifact] | None:
+    """Documentos ya generados para ese día si el TXT de entrada no ha cambiado (y siguen en disco)."""
+    try:
+        entry = json.loads(_manifest_path(country_slug).read_text(encoding="utf-8")).get(day)
+    except Exception:
+        return None
+    if not entry or entry.get("sig") != sig:
+        return None
+    artifacts = [(Path(p), name, caption, None) for p, name, caption in entry.get("artifacts", [])]
+    if not artifacts or not all(p.exists() for p, _, _, _ in artifacts):
+        return None
+    return artifacts
+
+
+def _manifest_store(country_slug: str, day: str, sig: List[int], artifacts: List[Artifact]) -> None:
+    path = _manifest_path(country_slug)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        data = {}
+    data[day] = {"sig": sig, "artifacts": [[str(p), name, caption] for p, name, caption, _ in artifacts]}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
 
 
 async def _run_sicu_full_for(
@@ -354,8 +685,50 @@ async def _run_sicu_full_for(
     chat_id: int,
     raw_country: str,
     day: str,
+    force: bool = False,
 ) -> None:
-    country_slug = _slugify_country(raw_country)
+    """
+    Pipeline SICU completo de un país/día. Los documentos se acumulan y se envían
+    juntos al final (también si el pipeline se corta a medias).
+    Si el TXT del día no ha cambiado desde la última ejecución completa (mtime + tamaño,
+    en .manifest.json), se reenvían los documentos ya generados sin recalcular nada.
+    """
+    country_slug = _country_slug(raw_country)
+    sig = _txt_signature(_country_dir(country_slug) / f"{day}.txt")
+    if sig and not force:
+        cached = await asyncio.to_thread(_manifest_lookup, country_slug, day, sig)
+        if cached:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=f"♻️ {raw_country.upper()} {day}: TXT sin cambios, reenvío los documentos ya generados.",
+            )
+            await _send_artifacts(bot, chat_id, cached)
+            return
+
+    artifacts: List[Artifact] = []
+    completed = False
+    try:
+        completed = await _sicu_full_pipeline(bot, chat_id, raw_country, day, artifacts)
+    finally:
+        if artifacts:
+            await _send_artifacts(bot, chat_id, artifacts)
+
+    if completed and sig:
+        try:
+            await asyncio.to_thread(_manifest_store, country_slug, day, sig, artifacts)
+        except Exception as e:
+            print(f"[sicu_full] no se pudo guardar el manifiesto: {e!r}")
+
+
+async def _sicu_full_pipeline(
+    bot,
+    chat_id: int,
+    raw_country: str,
+    day: str,
+    artifacts: List[Artifact],
+) -> bool:
+    """Genera los documentos en `artifacts`. True solo si el pipeline llegó al final sin errores."""
+    country_slug = _country_slug(raw_country)
     await bot.send_message(
         chat_id=chat_id,
         text=f"⏳ Pipeline SICU para {raw_country.upper()} {day}…",
@@ -368,123 +741,76 @@ async def _run_sicu_full_for(
             chat_id=chat_id,
             text=f"❌ No hay TXT para {raw_country.upper()} en {day}.\nBuscado: {txt_path}",
         )
-        return
+        return False
 
     try:
-        original_txt = txt_path.read_text(encoding="utf-8", errors="ignore")
+        # Bytes leídos una sola vez: se decodifican para el ingest y se reenvían tal cual
+        original_bytes = await asyncio.to_thread(txt_path.read_bytes)
+        original_txt = original_bytes.decode("utf-8", errors="ignore")
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
             text=f"❌ Error leyendo TXT {txt_path.name}: {e!r}",
         )
-        return
+        return False
 
     # Registrar incidentes desde TXT
     if original_txt.strip():
         ingest_country = country_slug.replace("_", " ").strip().title()
         try:
-            registrados = registrar_incidentes_desde_texto(
-                pais=ingest_country,
-                texto_informe=original_txt,
-                fuente=f"TXT {raw_country.upper()} {day}",
-                resolver_ahora=True,
-                country_hint=ingest_country,
-            )
+            async with _get_ingest_lock():
+                registrados = await asyncio.to_thread(
+                    registrar_incidentes_desde_texto,
+                    pais=ingest_country,
+                    texto_informe=original_txt,
+                    fuente=f"TXT {raw_country.upper()} {day}",
+                    resolver_ahora=True,
+                    country_hint=ingest_country,
+                )
             print(f"[sicu_full] {country_slug} {day}: {registrados} incidentes registrados desde TXT")
         except Exception as e:
             print(f"[sicu_full] fallo registrando incidentes desde TXT: {e!r}")
 
-    # Enviar TXT ORIGINAL
-    try:
-        with txt_path.open("rb") as fh:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(fh, filename=f"{country_slug}-{day}.txt"),
-                caption=f"{raw_country.upper()} :: {day} (TXT original)",
-            )
-    except Exception as e:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=f"⚠️ No se pudo enviar el TXT original: {e!r}",
-        )
+    # TXT ORIGINAL
+    artifacts.append((txt_path, f"{country_slug}-{day}.txt", f"{raw_country.upper()} :: {day} (TXT original)", original_bytes))
 
     # ===== 2) CSV INCIDENTES (TXT → CSV) =====
     try:
-        csv_incidentes_path, total_inc = save_incidentes_csv_from_txt(country_slug, day)
+        csv_incidentes_path, total_inc = await asyncio.to_thread(save_incidentes_csv_from_txt, country_slug, day)
         print(f"[sicu_full] CSV incidentes actualizado: {csv_incidentes_path} ({total_inc} filas)")
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
             text=f"❌ Error generando CSV de incidentes: {e!r}",
         )
-        return
+        return False
 
-    # Enviar CSV de incidentes
-    try:
-        with csv_incidentes_path.open("rb") as f:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(f, filename=csv_incidentes_path.name),
-                caption=f"📄 CSV INCIDENTES :: {raw_country.upper()} {day} ({total_inc} registros)",
-            )
-    except Exception as e:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=f"⚠️ CSV incidentes creado pero no enviado: {e!r}",
-        )
+    artifacts.append((
+        csv_incidentes_path,
+        csv_incidentes_path.name,
+        f"📄 CSV INCIDENTES :: {raw_country.upper()} {day} ({total_inc} registros)",
+        None,
+    ))
 
     # ===== 3) CSV SICU + TXT SICU =====
+    # Leer + normalizar + filtrar (E/S y CPU) en un hilo para no bloquear el bot
     try:
-        with csv_incidentes_path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            base_rows = list(reader)
+        total_rows, filtrados = await asyncio.to_thread(
+            _read_sicu_rows, csv_incidentes_path, day, country_slug
+        )
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
             text=f"❌ Error leyendo CSV incidentes {csv_incidentes_path.name}: {e!r}",
         )
-        return
+        return False
 
-    if not base_rows:
+    if not total_rows:
         await bot.send_message(
             chat_id=chat_id,
             text="ℹ️ El CSV de incidentes está vacío. No hay eventos para clasificar.",
         )
-        return
-
-    normalizados: List[Dict[str, Any]] = []
-    for r in base_rows:
-        fecha = r.get("fecha") or r.get("Fecha") or day
-        hora = r.get("hora") or r.get("Hora") or ""
-        pais = r.get("pais") or r.get("Pais") or country_slug.capitalize()
-        categoria_sicu = r.get("categoria_sicu") or r.get("Categoría SICU") or "Otros"
-        descripcion = (r.get("descripcion") or r.get("Breve descripción") or "").strip()
-        localizacion = (r.get("localizacion") or r.get("Localización") or "").strip()
-        lat = (r.get("lat") or r.get("Lat") or "").strip()
-        lon = (r.get("lon") or r.get("Lon") or "").strip()
-        fuente = (r.get("fuente") or r.get("Fuente_URL") or "").strip()
-
-        normalizados.append({
-            "fecha": fecha,
-            "hora": hora,
-            "pais": pais,
-            "categoria_sicu": categoria_sicu,
-            "descripcion": descripcion,
-            "localizacion": localizacion,
-            "lat": lat,
-            "lon": lon,
-            "fuente_URL": fuente,
-        })
-
-    filtrados: List[Dict[str, Any]] = []
-    for row in normalizados:
-        cat = (row.get("categoria_sicu") or "").strip().lower()
-        desc = (row.get("descripcion") or "").strip()
-        if not cat or not desc:
-            continue
-        if cat == "otros":
-            continue
-        filtrados.append(row)
+        return False
 
     if not filtrados:
         await bot.send_message(
@@ -494,15 +820,16 @@ async def _run_sicu_full_for(
                 "(solo 'Otros' o sin descripción relevante)."
             ),
         )
-        return
+        return False
 
-    # ✅ DEDUPLICACIÓN INTELIGENTE ANTES DE GENERAR CSV/TXT/INFORME
-    filtrados = deduplicate_sicu_incidents(filtrados)
+    # ✅ DEDUPLICACIÓN INTELIGENTE ANTES DE GENERAR CSV/TXT/INFORME (CPU → hilo)
+    filtrados = await asyncio.to_thread(deduplicate_sicu_incidents, filtrados)
 
     # Ordenar por fecha/hora para salida ordenada
-    filtrados.sort(key=lambda r: (r.get("fecha", ""), r.get("hora", "")))
+    # (fecha/hora siempre existen: las fija _read_sicu_rows)
+    filtrados.sort(key=itemgetter("fecha", "hora"))
 
-    country_sicu_dir = CATEG_BASE_DIR / country_slug
+    country_sicu_dir, report_dir = _sicu_dirs(country_slug)
     country_sicu_dir.mkdir(parents=True, exist_ok=True)
 
     csv_sicu_path = country_sicu_dir / f"{country_slug}-{day}_incidentes_SICU.csv"
@@ -510,97 +837,46 @@ async def _run_sicu_full_for(
 
     # Guardar CSV SICU
     try:
-        with csv_sicu_path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["fecha", "hora", "pais", "categoria_sicu",
-                            "descripcion", "localizacion", "lat", "lon", "fuente_URL"],
-            )
-            writer.writeheader()
-            writer.writerows(filtrados)
+        csv_sicu_bytes = await asyncio.to_thread(_build_sicu_csv, filtrados)
+        await asyncio.to_thread(csv_sicu_path.write_bytes, csv_sicu_bytes)
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
             text=f"❌ Error guardando CSV SICU: {e!r}",
         )
-        return
+        return False
 
-    # Enviar CSV SICU
-    try:
-        with csv_sicu_path.open("rb") as f:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(f, filename=csv_sicu_path.name),
-                caption=f"📄 CSV SICU :: {raw_country.upper()} {day}",
-            )
-    except Exception as e:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=f"⚠️ CSV SICU creado pero no enviado: {e!r}",
-        )
+    artifacts.append((csv_sicu_path, csv_sicu_path.name, f"📄 CSV SICU :: {raw_country.upper()} {day}", csv_sicu_bytes))
 
-    # Guardar y enviar TXT SICU agrupado
+    # Guardar TXT SICU agrupado
     try:
-        grouped = _group_by_category(filtrados)
-        lines_txt: List[str] = []
-        lines_txt.append("Sucesos / Incidentes (Clasificación SICU)\n")
-        for cat in ("Conflicto Armado", "Terrorismo", "Criminalidad",
-                    "Disturbios Civiles", "Hazards"):
-            items = grouped.get(cat, [])
-            if not items:
-                continue
-            loc_counts = Counter((it["localizacion"] or "Localización no especificada") for it in items)
-            top_locs = ", ".join(f"{loc} ({n})" for loc, n in loc_counts.most_common(3))
-            lines_txt.append(f"{cat}:")
-            if top_locs:
-                lines_txt.append(f"  Áreas principales: {top_locs}")
-            for it in items:
-                desc = it["descripcion"]
-                loc = it["localizacion"] or "Localización no especificada"
-                fuente = it.get("fuente_URL") or ""
-                linea = f" - {desc} → {loc}"
-                if fuente:
-                    linea += f" | Fuente: {fuente}"
-                lines_txt.append(linea)
-            lines_txt.append("")
-        txt_sicu_path.write_text("\n".join(lines_txt), encoding="utf-8")
-
-        with txt_sicu_path.open("rb") as f:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(f, filename=txt_sicu_path.name),
-                caption=f"TXT SICU :: {raw_country.upper()} {day}",
-            )
+        txt_sicu = await asyncio.to_thread(_build_sicu_grouped_txt, filtrados)
+        txt_sicu_bytes = txt_sicu.encode("utf-8")
+        await asyncio.to_thread(txt_sicu_path.write_bytes, txt_sicu_bytes)
+        artifacts.append((txt_sicu_path, txt_sicu_path.name, f"TXT SICU :: {raw_country.upper()} {day}", txt_sicu_bytes))
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
-            text=f"⚠️ Error generando/enviando TXT SICU: {e!r}",
+            text=f"⚠️ Error generando TXT SICU: {e!r}",
         )
 
     # ===== Informe SICU (plantilla sin LLM) =====
     try:
-        report_dir = OUTPUT_DIR / "sicu_reports" / country_slug
         report_dir.mkdir(parents=True, exist_ok=True)
         report_path = report_dir / f"{country_slug}-{day}_SICU_REPORT.txt"
 
-        report_txt = _build_sicu_report_txt(raw_country, country_slug, day, filtrados)
-        report_path.write_text(report_txt, encoding="utf-8")
-
-        with report_path.open("rb") as f:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(f, filename=report_path.name),
-                caption=f"📄 INFORME SICU :: {raw_country.upper()} {day}",
-            )
+        await asyncio.to_thread(_write_sicu_report, report_path, raw_country, country_slug, day, filtrados)
+        artifacts.append((report_path, report_path.name, f"📄 INFORME SICU :: {raw_country.upper()} {day}", None))
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
-            text=f"⚠️ Informe SICU generado pero no enviado: {e!r}",
+            text=f"⚠️ Error generando informe SICU: {e!r}",
         )
 
     # ===== KML desde CSV SICU =====
     try:
-        kml_path_str = csv_to_kml(
+        kml_path_str = await asyncio.to_thread(
+            csv_to_kml,
             csv_path=str(csv_sicu_path),
             out_path=None,
             day_iso=day,
@@ -608,27 +884,28 @@ async def _run_sicu_full_for(
             country=country_slug,
         )
         kml_path = Path(kml_path_str)
-        with kml_path.open("rb") as f:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=InputFile(f, filename=kml_path.name),
-                caption=f"🗺️ KML SICU :: {raw_country.upper()} {day}",
-            )
+        artifacts.append((kml_path, kml_path.name, f"🗺️ KML SICU :: {raw_country.upper()} {day}", None))
     except Exception as e:
         await bot.send_message(
             chat_id=chat_id,
-            text=f"⚠️ Error generando/enviando KML SICU: {e!r}",
+            text=f"⚠️ Error generando KML SICU: {e!r}",
         )
+        return False
+
+    return len(artifacts) == SICU_ARTIFACTS
 
 
 async def sicu_full(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    /sicu_full <pais> <YYYY-MM-DD>  (uso manual)
+    /sicu_full <pais> <YYYY-MM-DD> [force]  (uso manual)
+    Con `force` se regenera todo aunque el TXT del día no haya cambiado.
     """
     args = context.args or []
+    force = any(a.lower() in ("force", "--force") for a in args)
+    args = [a for a in args if a.lower() not in ("force", "--force")]
     if len(args) < 2:
         return await update.message.reply_text(
-            "Uso: /sicu_full <pais> <YYYY-MM-DD>\n"
+            "Uso: /sicu_full <pais> <YYYY-MM-DD> [force]\n"
             "Ejemplo: /sicu_full libia 2025-11-21"
         )
 
@@ -636,7 +913,7 @@ async def sicu_full(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     day = args[1].strip()
     chat_id = update.effective_chat.id
 
-    await _run_sicu_full_for(context.bot, chat_id, raw_country, day)
+    await _run_sicu_full_for(context.bot, chat_id, raw_country, day, force=force)
 
 
 async def sicu_full_job(context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -650,15 +927,21 @@ async def sicu_full_job(context: ContextTypes.DEFAULT_TYPE) -> None:
     day = today.isoformat()
 
     bot = context.bot
-    for country in AUTO_SICU_COUNTRIES:
-        try:
-            await _run_sicu_full_for(bot, chat_id, country, day)
-        except Exception as e:
-            print(f"[sicu_full_job] Error en país {country}: {e!r}")
+    sem = asyncio.Semaphore(SICU_JOB_CONCURRENCY)
+
+    async def _one(country: str) -> None:
+        async with sem:
             try:
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text=f"⚠️ Error en sicu_full_job para {country.upper()}: {e!r}",
-                )
-            except Exception:
-                pass
\ No newline at end of file
+                await _run_sicu_full_for(bot, chat_id, country, day)
+            except Exception as e:
+                print(f"[sicu_full_job] Error en país {country}: {e!r}")
+                try:
+                    await bot.send_message(
+                        chat_id=chat_id,
+                        text=f"⚠️ Error en sicu_full_job para {country.upper()}: {e!r}",
+                    )
+                except Exception:
+                    pass
+
+    # Países en paralelo (E/S de ficheros + subidas a Telegram), acotado para no saturar la API
+    await asyncio.gather(*(_one(c) for c in AUTO_SICU_COUNTRIES))
\ No newline at end of file
@@ -1,11 +1,27 @@
 # botapp/handlers/sicu_map.py
 from __future__ import annotations
+import asyncio
+import codecs
+import csv
+import hashlib
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
 from datetime import datetime, timezone, timedelta
 from telegram import Update, InputFile
 from telegram.ext import ContextTypes, CommandHandler
 from services.sicu_map import build_sicu_map
-import shutil
+
+try:  # pyahocorasick (opcional): búsqueda multi-patrón en una sola pasada
+    import ahocorasick
+except Exception:
+    ahocorasick = None
 
 # Zona horaria (Trípoli)
 TZ_TRIPOLI = timezone(timedelta(hours=2))
@@ -75,107 +91,214 @@ HEADER_ALIASES = {
     "severity": "Nivel de severidad",
 }
 
+# Cabecera en minúsculas (alias o nombre requerido) -> posición en REQUIRED_FIELDS
+_ALIAS_POS = {
+    **{f.lower(): i for i, f in enumerate(REQUIRED_FIELDS)},
+    **{alias: REQUIRED_FIELDS.index(req) for alias, req in HEADER_ALIASES.items()},
+}
+
+# Palabras clave por categoría, en orden de prioridad (gana la primera categoría que case,
+# no la coincidencia más a la izquierda).
+_CATEGORY_KEYWORDS = (
+    ("Conflicto Armado", ["conflicto", "armed", "combate", "enfrent", "hostilidad"]),
+    ("Terrorismo", ["terror", "ied", "vbied", "suicide", "bomba"]),
+    ("Disturbios Civiles", ["disturb", "protest", "riot", "manifest", "unrest", "bloqueo"]),
+    ("Hazards", ["hazard", "clima", "meteo", "inund", "incend", "accident", "desastre", "natural"]),
+    ("Criminalidad", ["crimen", "delinc", "rob", "asalto", "homic", "secuest", "extorsi", "theft", "crime"]),
+)
+
+# Sin pyahocorasick: una regex precompilada por categoría
+_CATEGORY_PATTERNS = [(re.compile("|".join(keys)), cat) for cat, keys in _CATEGORY_KEYWORDS]
+
+def _build_category_automaton():
+    """Autómata Aho-Corasick palabra -> prioridad de su categoría, o None sin pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for prio, (_, keys) in enumerate(_CATEGORY_KEYWORDS):
+        for kw in keys:
+            automaton.add_word(kw, prio)
+    automaton.make_automaton()
+    return automaton
+
+_CATEGORY_AUTOMATON = _build_category_automaton()
+
+# Valores ya canónicos: se devuelven tal cual sin buscar palabras clave
+# ("Criminalidad" no contiene ninguna de las suyas y acababa en "Otros")
+_CANONICAL_CATEGORIES = {cat.lower(): cat for _, cat in _CATEGORY_PATTERNS}
+_CANONICAL_CATEGORIES["otros"] = "Otros"
+
+_SEVERITY = {
+    "alta": "Alta", "alto": "Alta", "high": "Alta",
+    "media": "Media", "medio": "Media", "medium": "Media",
+    "baja": "Baja", "bajo": "Baja", "low": "Baja",
+}
+
+@lru_cache(maxsize=1024)
 def _normalize_category(value: str) -> str:
+    # Memoizada: la columna de categoría tiene muy pocos valores distintos
     c = (value or "").strip().lower()
-    if any(k in c for k in ["conflicto", "armed", "combate", "enfrent", "hostilidad"]):
-        return "Conflicto Armado"
-    if any(k in c for k in ["terror", "ied", "vbied", "suicide", "bomba"]):
-        return "Terrorismo"
-    if any(k in c for k in ["disturb", "protest", "riot", "manifest", "unrest", "bloqueo"]):
-        return "Disturbios Civiles"
-    if any(k in c for k in ["hazard", "clima", "meteo", "inund", "incend", "accident", "desastre", "natural"]):
-        return "Hazards"
-    if any(k in c for k in ["crimen", "delinc", "rob", "asalto", "homic", "secuest", "extorsi", "theft", "crime"]):
-        return "Criminalidad"
+    canonical = _CANONICAL_CATEGORIES.get(c)
+    if canonical:
+        return canonical
+    if _CATEGORY_AUTOMATON is not None:
+        # una sola pasada por el texto; de todas las coincidencias gana la categoría más prioritaria
+        prio = min((p for _, p in _CATEGORY_AUTOMATON.iter(c)), default=None)
+        return "Otros" if prio is None else _CATEGORY_KEYWORDS[prio][0]
+    for pattern, cat in _CATEGORY_PATTERNS:
+        if pattern.search(c):
+            return cat
     return "Otros"
 
 def _normalize_severity(value: str) -> str:
-    v = (value or "").strip().lower()
-    if v in {"alta", "alto", "high"}: return "Alta"
-    if v in {"media", "medio", "medium"}: return "Media"
-    if v in {"baja", "bajo", "low"}: return "Baja"
-    return "Media"  # por defecto
+    return _SEVERITY.get((value or "").strip().lower(), "Media")  # por defecto
 
-def _normalize_csv_to_required(csv_in: Path, csv_out: Path, default_date: str):
+CSV_DELIMITERS = (b",", b";", b"\t", b"|")
+ENCODING_SAMPLE_BYTES = 64 * 1024
+DELIM_SAMPLE_BYTES = 8 * 1024
+
+def _detect_delimiter(head: bytes) -> str:
     """
-    Lee csv_in (UTF-8 o latin1), intenta mapear/crear REQUIRED_FIELDS y escribe csv_out (UTF-8).
-    Lanza ValueError si no hay forma de componer columnas mínimas.
+    Delimitador por recuento (bytes.count, en C) en las primeras líneas de la cabecera en bruto,
+    sin decodificar y sin csv.Sniffer (cuyas regex pueden dispararse con ficheros grandes).
+    Gana el que aparece en más líneas con el mismo número de apariciones que en la cabecera;
+    en empate, el de más columnas. Los delimitadores son ASCII: vale para UTF-8 y latin-1.
     """
-    import csv, io
-
-    raw = csv_in.read_bytes()
-    text = None
-    for enc in ("utf-8", "utf-8-sig", "latin-1"):
-        try:
-            text = raw.decode(enc)
-            break
-        except Exception:
+    lines = head.splitlines()
+    if len(head) >= DELIM_SAMPLE_BYTES and len(lines) > 1:
+        lines.pop()  # última línea probablemente cortada
+    lines = [ln for ln in lines[:50] if ln.strip()]
+    if not lines:
+        return ","
+    best, best_score = b",", (0, 0)
+    for d in CSV_DELIMITERS:
+        n = lines[0].count(d)
+        if not n:
             continue
-    if text is None:
-        raise ValueError("No se pudo decodificar el CSV (utf-8/latin-1)")
+        score = (sum(ln.count(d) == n for ln in lines), n)
+        if score > best_score:
+            best, best_score = d, score
+    return best.decode("ascii")
 
-    # normalizamos saltos
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    # detectar delimitador
+def _sniff_encoding(sample: bytes) -> str:
+    """
+    Codificación a partir de la muestra inicial (sin cargar el CSV entero):
+    UTF-8 (con o sin BOM) si la muestra es válida, si no latin-1.
+    """
     try:
-        sniff_sample = "\n".join(text.split("\n")[:50])
-        dialect = csv.Sniffer().sniff(sniff_sample, delimiters=[",",";","\t","|"])
-        delim = dialect.delimiter
-    except Exception:
-        delim = ","
+        # decodificador incremental: un carácter multibyte cortado al final de la muestra no es error
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "latin-1"
 
-    reader = csv.reader(io.StringIO(text), delimiter=delim)
-    try:
-        hdr = next(reader)
-    except StopIteration:
-        raise ValueError("CSV vacío")
-
-    # mapa de índice -> nombre requerido (o None si desconocido)
-    idx_to_req = {}
-    for i, h in enumerate(hdr):
-        key = (h or "").strip()
-        k = key.lower()
-        req = HEADER_ALIASES.get(k)
-        if req:
-            idx_to_req[i] = req
-        elif key in REQUIRED_FIELDS:
-            idx_to_req[i] = key
-        else:
-            idx_to_req[i] = None  # columna no usada
+_I_FECHA = REQUIRED_FIELDS.index("Fecha")
+_I_CAT = REQUIRED_FIELDS.index("Categoría SICU")
+_I_SEV = REQUIRED_FIELDS.index("Nivel de severidad")
+_I_DESC = REQUIRED_FIELDS.index("Breve descripción")
+_I_LOC = REQUIRED_FIELDS.index("Localización")
 
-    # recorre filas y crea diccionario con REQUIRED_FIELDS
-    rows = []
+def _iter_required_rows(reader, col_pos: list[int], default_date: str) -> Iterator[list[str]]:
+    """Filas ya normalizadas (en el orden de REQUIRED_FIELDS), una a una; descarta las vacías."""
+    n_req = len(REQUIRED_FIELDS)
     for parts in reader:
         if not any(parts):
             continue
-        row = {f: "" for f in REQUIRED_FIELDS}
-        for i, val in enumerate(parts):
-            req = idx_to_req.get(i)
-            if not req:
-                continue
-            row[req] = (val or "").strip()
+        vals = [""] * n_req
+        for j, val in zip(col_pos, parts):
+            if j >= 0:
+                vals[j] = (val or "").strip()
 
         # defaults / normalizaciones
-        if not row["Fecha"]:
-            row["Fecha"] = default_date
-        row["Categoría SICU"] = _normalize_category(row["Categoría SICU"])
-        row["Nivel de severidad"] = _normalize_severity(row["Nivel de severidad"])
-        rows.append(row)
-
-    # Comprobar si tenemos al menos descripción + categoría + localización
-    valid = [r for r in rows if r["Breve descripción"] or r["Localización"] or r["Categoría SICU"]]
-    if not valid:
-        raise ValueError("No se pudieron construir filas válidas para el esquema requerido.")
-
-    # escribir CSV normalizado
-    with open(csv_out, "w", newline="", encoding="utf-8") as f:
-        w = import_csv_writer = __import__("csv").DictWriter  # evitar sombrear nombre
-        w = import_csv_writer(f, fieldnames=REQUIRED_FIELDS)
-        w.writeheader()
-        w.writerows(valid)
+        if not vals[_I_FECHA]:
+            vals[_I_FECHA] = default_date
+        vals[_I_CAT] = _normalize_category(vals[_I_CAT])
+        vals[_I_SEV] = _normalize_severity(vals[_I_SEV])
+
+        # al menos descripción, localización o categoría
+        if vals[_I_DESC] or vals[_I_LOC] or vals[_I_CAT]:
+            yield vals
+
+def _write_required_csv(csv_in: Path, tmp_out: Path, encoding: str, delim: str, default_date: str) -> int:
+    """Lee csv_in y escribe tmp_out fila a fila (sin listas intermedias). Devuelve nº de filas escritas."""
+    with csv_in.open("r", encoding=encoding, newline="") as fin, \
+            open(tmp_out, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.reader(fin, delimiter=delim)
+        try:
+            hdr = next(reader)
+        except StopIteration:
+            raise ValueError("CSV vacío")
+
+        # posición en REQUIRED_FIELDS de cada columna de entrada (-1 si no se usa)
+        col_pos = [_ALIAS_POS.get((h or "").strip().lower(), -1) for h in hdr]
+
+        w = csv.writer(fout)
+        w.writerow(REQUIRED_FIELDS)
+        n = 0
+        for n, row in enumerate(_iter_required_rows(reader, col_pos, default_date), 1):
+            w.writerow(row)
+    return n
+
+def _normalize_csv_to_required(csv_in: Path, csv_out: Path, default_date: str):
+    """
+    Lee csv_in (UTF-8 o latin1), intenta mapear/crear REQUIRED_FIELDS y escribe csv_out (UTF-8).
+    Lanza ValueError si no hay forma de componer columnas mínimas.
+    Se procesa en streaming sobre un temporal (csv_in y csv_out pueden ser el mismo fichero).
+    """
+    with csv_in.open("rb") as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    encoding = _sniff_encoding(sample)
+    # detectar delimitador (sobre los primeros 8 KB)
+    delim = _detect_delimiter(sample[:DELIM_SAMPLE_BYTES])
+
+    # Temporal con nombre único: dos /sicu_map simultáneos del mismo país/día no se pisan
+    csv_out = Path(csv_out)
+    fd, tmp_name = tempfile.mkstemp(dir=csv_out.parent, prefix=csv_out.name + ".", suffix=".tmp")
+    os.close(fd)
+    tmp_out = Path(tmp_name)
+    try:
+        try:
+            n = _write_required_csv(csv_in, tmp_out, encoding, delim, default_date)
+        except UnicodeDecodeError:
+            # la muestra era UTF-8 pero el resto del fichero no
+            n = _write_required_csv(csv_in, tmp_out, "latin-1", delim, default_date)
+        if not n:
+            raise ValueError("No se pudieron construir filas válidas para el esquema requerido.")
+        os.replace(tmp_out, csv_out)
+    finally:
+        tmp_out.unlink(missing_ok=True)
 
     return csv_out
 
+# Normalizaciones simultáneas (una por país) en procesos separados.
+# "forkserver": hacer fork() del bot, que ya tiene muchos hilos, puede bloquear al hijo.
+SICU_MAP_WORKERS = min(4, os.cpu_count() or 1)
+_NORM_POOL: ProcessPoolExecutor | None = None
+
+def _get_norm_pool() -> ProcessPoolExecutor:
+    global _NORM_POOL
+    if _NORM_POOL is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _NORM_POOL = ProcessPoolExecutor(
+            max_workers=SICU_MAP_WORKERS, mp_context=multiprocessing.get_context(method)
+        )
+    return _NORM_POOL
+
+def shutdown_norm_pool() -> None:
+    """Cierra el pool de normalización (apagado del bot)."""
+    global _NORM_POOL
+    if _NORM_POOL is not None:
+        _NORM_POOL.shutdown(wait=False, cancel_futures=True)
+        _NORM_POOL = None
+
+def _file_hash(path: Path) -> str:
+    """BLAKE2b del fichero leído en bloques de 1 MB (sin cargarlo entero)."""
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
 async def sicu_map_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     /sicu_map <pais> [YYYY-MM-DD] [ruta_csv_opcional]
@@ -211,7 +334,8 @@ async def sicu_map_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                     f"❌ No existe el CSV proporcionado:\n{src}"
                 )
             try:
-                shutil.copy2(src, csv_std)  # sobrescribe si existe
+                # sobrescribe si existe; copy2 ya usa la copia del kernel (sendfile/fcopyfile)
+                await asyncio.to_thread(shutil.copy2, src, csv_std)
             except Exception as e:
                 return await update.effective_message.reply_text(
                     f"❌ No pude copiar al nombre estándar:\n{csv_std}\nDetalle: {e!r}"
@@ -227,41 +351,55 @@ async def sicu_map_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                     "Sugerencia: pásame la ruta del CSV como 3er argumento para normalizarlo automáticamente."
                 )
 
-        # 2) Normalizar CSV a esquema requerido (se escribe en el mismo estándar)
-        try:
-            _normalize_csv_to_required(csv_std, csv_std, default_date=date_used)
-        except ValueError as ve:
-            return await update.effective_message.reply_text(
-                "❌ CSV inválido para el mapa SICU.\n"
-                f"Detalle: {ve}\n"
-                "Consejo: revisa que el CSV tenga información mínima (categoría/descripcion/localización)."
-            )
-        except Exception as e:
-            return await update.effective_message.reply_text(
-                "❌ Error normalizando el CSV al esquema requerido.\n"
-                f"Detalle: {type(e).__name__}: {e}"
-            )
-
-        # 3) Asegurar reemplazo del HTML: si existe, eliminarlo para escribir uno limpio
-        if html_out.exists():
+        # 2) Si el CSV no cambió desde el último mapa (hash en <html>.sha), se reenvía el HTML tal cual
+        sha_path = html_out.with_suffix(".sha")
+        csv_hash = await asyncio.to_thread(_file_hash, csv_std)
+        reuse = html_out.exists() and sha_path.exists() and sha_path.read_text(encoding="utf-8") == csv_hash
+        if reuse:
+            out_file = str(html_out)
+        else:
+            # 2) Normalizar CSV a esquema requerido (se escribe en el mismo estándar)
             try:
-                html_out.unlink()
-            except Exception:
-                pass
+                # CPU en un proceso aparte: varios /sicu_map seguidos no se pelean por el GIL
+                # (ni bloquean el bot)
+                await asyncio.get_running_loop().run_in_executor(
+                    _get_norm_pool(), _normalize_csv_to_required, csv_std, csv_std, date_used,
+                )
+            except ValueError as ve:
+                return await update.effective_message.reply_text(
+                    "❌ CSV inválido para el mapa SICU.\n"
+                    f"Detalle: {ve}\n"
+                    "Consejo: revisa que el CSV tenga información mínima (categoría/descripcion/localización)."
+                )
+            except Exception as e:
+                return await update.effective_message.reply_text(
+                    "❌ Error normalizando el CSV al esquema requerido.\n"
+                    f"Detalle: {type(e).__name__}: {e}"
+                )
+
+            # 3) Asegurar reemplazo del HTML: si existe, eliminarlo para escribir uno limpio
+            if html_out.exists():
+                try:
+                    html_out.unlink()
+                except Exception:
+                    pass
 
-        # 4) Generar mapa desde el CSV estándar ya normalizado
-        out_file = build_sicu_map(str(csv_std), str(html_out))
+            # 4) Generar mapa desde el CSV estándar ya normalizado
+            out_file = await asyncio.to_thread(build_sicu_map, str(csv_std), str(html_out))
+
+            # el CSV normalizado es el que encontrará la próxima ejecución
+            sha_path.write_text(await asyncio.to_thread(_file_hash, csv_std), encoding="utf-8")
 
         # 5) Enviar HTML
-        with open(out_file, "rb") as f:
-            await update.effective_message.reply_document(
-                document=InputFile(f, filename=html_out.name),
-                caption=(
-                    f"🗺️ Mapa SICU • {country.upper()} • {date_used}\n"
-                    f"📄 CSV del día: {csv_std.name}\n"
-                    "♻️ Salida reemplazada si existía."
-                ),
-            )
+        html_bytes = await asyncio.to_thread(Path(out_file).read_bytes)
+        await update.effective_message.reply_document(
+            document=InputFile(html_bytes, filename=html_out.name),
+            caption=(
+                f"🗺️ Mapa SICU • {country.upper()} • {date_used}\n"
+                f"📄 CSV del día: {csv_std.name}\n"
+                + ("♻️ CSV sin cambios: mapa reutilizado." if reuse else "♻️ Salida reemplazada si existía.")
+            ),
+        )
 
     except Exception as e:
         await update.effective_message.reply_text(
@@ -14,7 +14,7 @@ from botapp.handlers.generate_report import generate_report_step1
 from botapp.handlers.generate_report import generate_report_step2
 
 from botapp.handlers.map import map_incidentes
-from botapp.handlers.sicu_map import sicu_map_cmd
+from botapp.handlers.sicu_map import sicu_map_cmd, shutdown_norm_pool
 from botapp.handlers.audit_geo import audit_csv_cmd
 from botapp.handlers.incidentes_categorizados import incidentes_categorizados
 from botapp.handlers.scrape import scrape, scrape_all, scrape_auto_job
@@ -24,7 +24,7 @@ from botapp.handlers.csv_to_kml import csv_to_kml_cmd
 from botapp.handlers.scrape_x import scrape_x, scrape_x_job
 from botapp.handlers.sicu_map import get_handlers as get_sicu_map_handlers
 from botapp.handlers.sicu_full import sicu_full, sicu_full_job  # 👈 ya incluye sicu_full y sicu_full_job
-from botapp.handlers.sicu_ai import sicu_ai
+from botapp.handlers.sicu_ai import sicu_ai, sicu_ai_job, sicu_ai_collect_job
 
 
 import pytz
@@ -65,7 +65,7 @@ from botapp.handlers.days import txtdia, txtrango, txtsemana, zipsemana, txtdia_
 from botapp.handlers.periods import report_dia, report_semana, report_quincena, report_mes, zip_period
 
 # Vuelos
-from botapp.handlers.flights import flights, route_add, route_list, flights_addroutes_bootstrap
+from botapp.handlers.flights import flights, route_add, route_list, flights_addroutes_bootstrap, flights_shutdown
 
 # ===== Menú de comandos (Telegram command menu) =====
 COMMANDS_MENU = [
@@ -119,6 +119,17 @@ async def post_init(application: Application) -> None:
     except Exception as e:
         print(f"⚠️ set_my_commands falló (se continúa): {e!r}")
 
+async def post_shutdown(application: Application) -> None:
+    # Cierra sesiones HTTP de larga duración (evita 'Unclosed client session') y pools de procesos
+    try:
+        await flights_shutdown()
+    except Exception as e:
+        print(f"⚠️ cierre de sesión de vuelos falló: {e!r}")
+    try:
+        shutdown_norm_pool()
+    except Exception as e:
+        print(f"⚠️ cierre del pool de sicu_map falló: {e!r}")
+
 async def on_error(update, context):
     print(f"❗ Error: {context.error!r}")
 
@@ -168,6 +179,7 @@ def build_app() -> Application:
         .builder()
         .token(settings.telegram_bot_token)
         .post_init(post_init)
+        .post_shutdown(post_shutdown)
         .build()
     )
 
@@ -279,6 +291,16 @@ def build_app() -> Application:
                 chat_id=SICU_CHAT_ID,
             )
 
+        # Informes IA del día vía Batch API (tras el último sicu_full de las 21:00)
+        app.job_queue.run_daily(
+            sicu_ai_job,
+            time=dtime(hour=22, minute=0, second=0, tzinfo=tz),
+            name="sicu_ai_batch",
+            chat_id=SICU_CHAT_ID,
+        )
+        # Recoge batches enviados antes de un reinicio (si no hay ninguno, no se reprograma)
+        app.job_queue.run_once(sicu_ai_collect_job, when=60, name="sicu_ai_collect")
+
     app.add_error_handler(on_error)
     return app
 
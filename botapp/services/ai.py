@@ -1,24 +1,135 @@
+import asyncio
 import os
-from typing import Dict
-from openai import OpenAI
+import threading
+from typing import Dict, List, Optional, Sequence
+from openai import AsyncOpenAI, OpenAI
+
+try:  # tiktoken (opcional): recorte del artículo por tokens en lugar de caracteres
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw.strip())
+    except Exception:
+        return default
 
 _MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# Resúmenes simultáneos como máximo (global: compartido por todos los países en paralelo)
+AI_SUMMARY_CONCURRENCY = max(1, _env_int("AI_SUMMARY_CONCURRENCY", 10))
+# Tamaño máximo del contenido enviado para resumir (tokens con tiktoken, si no caracteres)
+AI_SUMMARY_MAX_TOKENS = max(1, _env_int("AI_SUMMARY_MAX_TOKENS", 1500))
+AI_SUMMARY_MAX_CHARS = 4000
+_SUMMARY_SEM: asyncio.Semaphore | None = None
 
-def summarize_article_es(title: str, content: str) -> str:
-    """
-    Devuelve un resumen en español (5-8 líneas) destacando lo operativo y los hechos clave.
-    """
-    client = OpenAI()
-    prompt = (
+# Clientes compartidos: reutilizan el pool HTTP (keep-alive) entre resúmenes
+_CLIENT: Optional[OpenAI] = None
+_ASYNC_CLIENT: Optional[AsyncOpenAI] = None
+
+def _get_client() -> OpenAI:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = OpenAI()
+    return _CLIENT
+
+def _get_async_client() -> AsyncOpenAI:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = AsyncOpenAI()
+    return _ASYNC_CLIENT
+
+# Codificador tiktoken: la primera carga descarga el fichero BPE (bloqueante), así que
+# en la ruta async se hace en un hilo. Un fallo también se recuerda (None → recorte por caracteres).
+_ENC_UNSET = object()
+_ENCODING = _ENC_UNSET
+_ENC_LOCK = threading.Lock()
+
+def _load_encoding():
+    global _ENCODING
+    with _ENC_LOCK:
+        if _ENCODING is _ENC_UNSET:
+            enc = None
+            if tiktoken is not None:
+                try:
+                    try:
+                        enc = tiktoken.encoding_for_model(_MODEL)
+                    except KeyError:
+                        enc = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    print(f"[ai] tiktoken no disponible, recorte por caracteres: {e!r}")
+            _ENCODING = enc
+    return _ENCODING
+
+async def _ensure_encoding() -> None:
+    if _ENCODING is _ENC_UNSET:
+        await asyncio.to_thread(_load_encoding)
+
+def _trim_content(content: str) -> str:
+    """Recorta el artículo a AI_SUMMARY_MAX_TOKENS tokens (o AI_SUMMARY_MAX_CHARS sin cortar palabras)."""
+    enc = _ENCODING if _ENCODING is not _ENC_UNSET else None
+    if enc is not None:
+        toks = enc.encode(content)
+        return content if len(toks) <= AI_SUMMARY_MAX_TOKENS else enc.decode(toks[:AI_SUMMARY_MAX_TOKENS])
+    if len(content) <= AI_SUMMARY_MAX_CHARS:
+        return content
+    return content[:AI_SUMMARY_MAX_CHARS].rsplit(" ", 1)[0]
+
+def _summary_prompt(title: str, content: str) -> str:
+    return (
         "Resume en español (5-8 líneas) el siguiente artículo. "
         "Da prioridad a hechos verificables, cifras, fechas y posibles impactos locales. "
         "Evita opiniones. Devuelve texto plano sin viñetas.\n\n"
         f"TÍTULO: {title}\n\n"
-        f"CONTENIDO:\n{content[:4000]}"
+        f"CONTENIDO:\n{_trim_content(content)}"
+    )
+
+def summarize_article_es(title: str, content: str) -> str:
+    """
+    Devuelve un resumen en español (5-8 líneas) destacando lo operativo y los hechos clave.
+    """
+    _load_encoding()
+    resp = _get_client().responses.create(
+        model=_MODEL,
+        input=_summary_prompt(title, content),
+        temperature=0.3,
     )
-    resp = client.responses.create(
+    return (resp.output_text or "").strip()
+
+async def summarize_article_es_async(title: str, content: str) -> str:
+    """
+    Versión asíncrona de summarize_article_es (para lanzar varios resúmenes con asyncio.gather).
+    """
+    await _ensure_encoding()
+    resp = await _get_async_client().responses.create(
         model=_MODEL,
-        input=prompt,
+        input=_summary_prompt(title, content),
         temperature=0.3,
     )
-    return (resp.output_text or "").strip()
\ No newline at end of file
+    return (resp.output_text or "").strip()
+
+def _get_summary_semaphore() -> asyncio.Semaphore:
+    global _SUMMARY_SEM
+    if _SUMMARY_SEM is None:
+        _SUMMARY_SEM = asyncio.Semaphore(AI_SUMMARY_CONCURRENCY)
+    return _SUMMARY_SEM
+
+async def summarize_many_es(articles: Sequence[tuple[str, str]]) -> List[str]:
+    """
+    Resume [(título, contenido), ...] en paralelo (como mucho AI_SUMMARY_CONCURRENCY a la vez,
+    contando todas las llamadas simultáneas a esta función).
+    Devuelve los resúmenes en el mismo orden; "" para los que fallen.
+    """
+    sem = _get_summary_semaphore()
+
+    async def one(title: str, content: str) -> str:
+        async with sem:
+            try:
+                return await summarize_article_es_async(title, content)
+            except Exception:
+                return ""
+
+    return list(await asyncio.gather(*(one(t, c) for t, c in articles)))
\ No newline at end of file
@@ -1,32 +1,70 @@
 from __future__ import annotations
 from pathlib import Path
-import json
+import atexit
+import time
+import orjson
 from typing import Dict
 
+from .sqlite_kv import connect_kv
+
+# Write-behind: como mucho una escritura cada FLUSH_EVERY cambios o FLUSH_INTERVAL_S segundos
+FLUSH_EVERY = 64
+FLUSH_INTERVAL_S = 2.0
+
+_UPSERT = (
+    "INSERT INTO state (channel, msg_id) VALUES (?, ?) "
+    "ON CONFLICT(channel) DO UPDATE SET msg_id = excluded.msg_id"
+)
+
 class CollectState:
     """
-    Guarda last_message_id por canal:
-    { "@canal": 123456 }
+    Guarda last_message_id por canal (tabla `state` en collect_state.sqlite3,
+    una fila por canal: cada escritura toca solo los canales que cambiaron).
+
+    set_last_id actualiza memoria y agrupa las escrituras (FLUSH_EVERY / FLUSH_INTERVAL_S);
+    flush() fuerza la escritura (final de cada barrido del collector y salida del proceso).
     """
     def __init__(self, data_dir: str):
-        self.path = Path(data_dir) / "collect_state.json"
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self._write({})
-        self._cache = self._read()
+        self.path = Path(data_dir) / "collect_state.sqlite3"
+        self._conn = connect_kv(self.path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state (channel TEXT PRIMARY KEY, msg_id INTEGER NOT NULL)"
+            )
+        self._import_legacy_json(Path(data_dir) / "collect_state.json")
+        self._cache: Dict[str, int] = dict(self._conn.execute("SELECT channel, msg_id FROM state"))
+        self._pending: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
 
-    def _read(self) -> Dict[str, int]:
+    def _import_legacy_json(self, legacy: Path) -> None:
+        """Migra una sola vez el antiguo collect_state.json ({ "@canal": 123456 })."""
+        if not legacy.exists():
+            return
         try:
-            return json.loads(self.path.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-
-    def _write(self, data: Dict[str, int]) -> None:
-        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            data = orjson.loads(legacy.read_bytes())
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO state (channel, msg_id) VALUES (?, ?)",
+                    ((ch, int(mid)) for ch, mid in data.items()),
+                )
+            legacy.rename(legacy.with_suffix(".json.migrated"))
+        except Exception as e:
+            print(f"[collect_state] no se pudo migrar {legacy.name}: {e!r}")
 
     def get_last_id(self, channel: str) -> int:
         return int(self._cache.get(channel, 0))
 
     def set_last_id(self, channel: str, msg_id: int) -> None:
-        self._cache[channel] = int(msg_id)
-        self._write(self._cache)
\ No newline at end of file
+        self._cache[channel] = self._pending[channel] = int(msg_id)
+        if len(self._pending) >= FLUSH_EVERY or time.monotonic() - self._last_flush > FLUSH_INTERVAL_S:
+            self.flush()
+
+    def flush(self) -> None:
+        """Persiste (en una transacción) los canales cambiados desde la última escritura."""
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(_UPSERT, self._pending.items())
+        self._pending.clear()
+        self._last_flush = time.monotonic()
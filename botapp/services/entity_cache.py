@@ -1,10 +1,18 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 from pathlib import Path
-import json
-from typing import Optional, Dict, Any
+import orjson
+from typing import Optional, Dict
 from telethon.tl.types import InputPeerChannel, InputPeerChat, Channel as TLChannel, Chat as TLChat
 
+from .sqlite_kv import connect_kv
+
+_INSERT = "INSERT INTO entities (key, type, id, access_hash, title, username) VALUES (?, ?, ?, ?, ?, ?)"
+_UPSERT = (
+    _INSERT + " ON CONFLICT(key) DO UPDATE SET type = excluded.type, id = excluded.id, "
+    "access_hash = excluded.access_hash, title = excluded.title, username = excluded.username"
+)
+
 
 @dataclass
 class EntityRecord:
@@ -23,23 +31,50 @@ class EntityRecord:
 
 
 class EntityCache:
+    """
+    Entidades de Telegram ya resueltas (tabla `entities` en entity_cache.sqlite3):
+    recordar una entidad escribe solo su fila, no el caché entero.
+    """
     def __init__(self, data_dir: str) -> None:
-        self.path = Path(data_dir) / "entity_cache.json"
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = Path(data_dir) / "entity_cache.sqlite3"
+        self._conn = connect_kv(self.path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                "key TEXT PRIMARY KEY, type TEXT NOT NULL, id INTEGER NOT NULL, "
+                "access_hash INTEGER, title TEXT, username TEXT)"
+            )
         self._cache: Dict[str, EntityRecord] = {}
+        self._import_legacy_json(Path(data_dir) / "entity_cache.json")
         self._load()
 
+    def _import_legacy_json(self, legacy: Path) -> None:
+        """Migra una sola vez el antiguo entity_cache.json."""
+        if not legacy.exists():
+            return
+        try:
+            raw = orjson.loads(legacy.read_bytes())
+            with self._conn:
+                self._conn.executemany(
+                    _INSERT.replace("INSERT", "INSERT OR IGNORE", 1),
+                    ((k, *astuple(EntityRecord(**v))) for k, v in raw.items()),
+                )
+            legacy.rename(legacy.with_suffix(".json.migrated"))
+        except Exception as e:
+            print(f"[entity_cache] no se pudo migrar {legacy.name}: {e!r}")
+
     def _load(self) -> None:
         try:
-            raw = json.loads(self.path.read_text(encoding="utf-8"))
-            for k, v in raw.items():
-                self._cache[k] = EntityRecord(**v)
+            rows = self._conn.execute(
+                "SELECT key, type, id, access_hash, title, username FROM entities"
+            )
+            self._cache = {k: EntityRecord(*rest) for k, *rest in rows}
         except Exception:
             self._cache = {}
 
-    def _save(self) -> None:
-        data: Dict[str, Any] = {k: vars(v) for k, v in self._cache.items()}
-        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    def _save(self, key: str, rec: EntityRecord) -> None:
+        with self._conn:
+            self._conn.execute(_UPSERT, (key, *astuple(rec)))
 
     def get_input_peer(self, key: str):
         rec = self._cache.get(key)
@@ -67,8 +102,10 @@ class EntityCache:
                 )
             else:
                 return False
+            if self._cache.get(key) == rec:
+                return True  # sin cambios: no se reescribe el fichero
             self._cache[key] = rec
-            self._save()
+            self._save(key, rec)
             return True
         except Exception:
             return False
@@ -2,36 +2,168 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Iterable
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
 
 logger = logging.getLogger(__name__)
 
 EXCHANGE_API_URL = "https://api.exchangerate.host/latest"
 
+# Los tipos de cambio cambian pocas veces al día: se reutilizan durante EXCHANGE_TTL segundos
+EXCHANGE_TTL = int(os.getenv("EXCHANGE_TTL", "21600"))
+_RATE_CACHE: Dict[Tuple[str, Tuple[str, ...]], Tuple[float, Dict[str, float]]] = {}
+_RATE_LOCK = threading.Lock()
+
+USER_AGENT = "MIBOT3/1.0 (exchange)"
+
+# Divisa local por país (slug de data/<pais>): (código ISO 4217, nombre para el bloque)
+COUNTRY_CURRENCIES: Dict[str, Tuple[str, str]] = {
+    "libia": ("LYD", "Dinar Libio"),
+    "haiti": ("HTG", "Gourde Haitiano"),
+    "colombia": ("COP", "Peso Colombiano"),
+    "gaza": ("ILS", "Nuevo Séquel Israelí"),
+    "mali": ("XOF", "Franco CFA"),
+    "egipto": ("EGP", "Libra Egipcia"),
+    "liberia": ("LRD", "Dólar Liberiano"),
+}
+
+# Sesión HTTP compartida: conexión keep-alive (sin TLS nuevo por llamada) y reintentos en 429/5xx
+_SESSION: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry))
+        session.headers["User-Agent"] = USER_AGENT
+        _SESSION = session
+    return _SESSION
+
+
+def _cache_key(base: str, symbols: list[str]) -> Tuple[str, Tuple[str, ...]]:
+    return (base, tuple(sorted(symbols)))
+
+
+def _cached_rates(key: Tuple[str, Tuple[str, ...]]) -> Optional[Dict[str, float]]:
+    with _RATE_LOCK:
+        hit = _RATE_CACHE.get(key)
+    if hit is not None and time.monotonic() - hit[0] < EXCHANGE_TTL:
+        return dict(hit[1])
+    return None
+
+
+def _store_rates(key: Tuple[str, Tuple[str, ...]], data: dict, symbols: list[str]) -> Dict[str, float]:
+    """
+    Tasas de la respuesta. Solo se cachean si están todas: exchangerate.host responde 200
+    con {"success": false} cuando falta la clave o se agota la cuota, y eso no debe
+    quedarse EXCHANGE_TTL segundos en la caché.
+    """
+    rates = data.get("rates", {}) or {}
+    result = {sym: float(rates.get(sym, 0) or 0) for sym in symbols}
+    if data.get("success") is False or any(v <= 0 for v in result.values()):
+        logger.warning("Respuesta de tipos de cambio incompleta (no se cachea): %s", data.get("error") or data)
+        return result
+    with _RATE_LOCK:
+        _RATE_CACHE[key] = (time.monotonic(), result)
+    return dict(result)
+
 
 def get_rates(base: str, symbols: Iterable[str]) -> Dict[str, float]:
     """
     Obtiene tasas de cambio desde exchangerate.host.
     base -> divisa base (ej: USD)
     symbols -> lista de divisas objetivo (ej: ["HTG", "EUR"])
+    Resultados cacheados en memoria EXCHANGE_TTL segundos (los errores no se cachean).
     """
-    symbols_str = ",".join(symbols)
+    symbols = list(symbols)
+    key = _cache_key(base, symbols)
+    cached = _cached_rates(key)
+    if cached is not None:
+        return cached
+
     try:
-        resp = requests.get(
+        resp = _get_session().get(
             EXCHANGE_API_URL,
-            params={"base": base, "symbols": symbols_str},
+            params={"base": base, "symbols": ",".join(symbols)},
             timeout=10,
         )
         resp.raise_for_status()
-        data = resp.json()
-        rates = data.get("rates", {}) or {}
-        return {sym: float(rates.get(sym, 0)) for sym in symbols}
+        return _store_rates(key, resp.json(), symbols)
     except Exception as exc:
         logger.error("Error obteniendo tipos de cambio: %s", exc)
         raise
 
 
+async def get_rates_async(
+    session: Optional["aiohttp.ClientSession"],
+    base: str,
+    symbols: Iterable[str],
+) -> Dict[str, float]:
+    """
+    Versión asíncrona de get_rates (misma caché en memoria), para no bloquear el event loop.
+    Si no se pasa `session`, abre una temporal.
+    """
+    if aiohttp is None:
+        raise RuntimeError("Dependencia 'aiohttp' no instalada. Instala requirements.txt.")
+    symbols = list(symbols)
+    key = _cache_key(base, symbols)
+    cached = _cached_rates(key)
+    if cached is not None:
+        return cached
+
+    params = {"base": base, "symbols": ",".join(symbols)}
+    timeout = aiohttp.ClientTimeout(total=10)
+    try:
+        if session is None:
+            async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as tmp:
+                async with tmp.get(EXCHANGE_API_URL, params=params, timeout=timeout) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json(content_type=None)
+        else:
+            async with session.get(EXCHANGE_API_URL, params=params, timeout=timeout) as resp:
+                resp.raise_for_status()
+                data = await resp.json(content_type=None)
+        return _store_rates(key, data, symbols)
+    except Exception as exc:
+        logger.error("Error obteniendo tipos de cambio: %s", exc)
+        raise
+
+
+def _format_exchange_block(
+    local_currency: str,
+    local_label: str,
+    foreign_currencies: list[str],
+    rates: Optional[Dict[str, float]],
+) -> str:
+    lines = [f"💱 TIPO DE CAMBIO – {local_label} ({local_currency})\n"]
+
+    # 1 LOCAL = r FOREIGN para todas las divisas → 1 FOREIGN = 1/r LOCAL
+    # Sin tasas (fallo de la API) dejamos valores genéricos
+    for foreign in foreign_currencies:
+        rate = rates.get(foreign) if rates else None
+        value = f"{1.0 / rate:.1f}" if rate and rate > 0 else "XXX"
+        lines.append(f"• 1 {foreign} = {value} {local_currency}")
+
+    lines.append("")
+    lines.append("Impacto operativo:")
+    lines.append("– Variación de precios en combustible, transportes, logística.")
+    lines.append("– Riesgo inflacionario para operaciones prolongadas.")
+
+    return "\n".join(lines)
+
+
 def build_exchange_block(
     local_currency: str,
     local_label: str,
@@ -43,37 +175,35 @@ def build_exchange_block(
     Ejemplo Haití:
       build_exchange_block("HTG", "Gourde Haitiano")
     """
-    lines = [f"💱 TIPO DE CAMBIO – {local_label} ({local_currency})\n"]
-
-    values: Dict[str, str] = {}
-
+    foreign_currencies = list(foreign_currencies)
     try:
-        # Para cada divisa extranjera, queremos: 1 FOREIGN = X LOCAL
-        for foreign in foreign_currencies:
-            rates = get_rates(base=foreign, symbols=[local_currency])
-            local_val = rates.get(local_currency)
-            if local_val and local_val > 0:
-                values[foreign] = f"{local_val:.1f} {local_currency}"
-            else:
-                values[foreign] = f"XXX {local_currency}"
+        # Una sola llamada para todas las divisas
+        rates = get_rates(base=local_currency, symbols=foreign_currencies)
     except Exception:
-        # Si falla la API, dejamos valores genéricos
-        for foreign in foreign_currencies:
-            values[foreign] = f"XXX {local_currency}"
-
-    for foreign in foreign_currencies:
-        lines.append(f"• 1 {foreign} = {values[foreign]}")
+        rates = None
+    return _format_exchange_block(local_currency, local_label, foreign_currencies, rates)
 
-    lines.append("")
-    lines.append("Impacto operativo:")
-    lines.append("– Variación de precios en combustible, transportes, logística.")
-    lines.append("– Riesgo inflacionario para operaciones prolongadas.")
 
-    return "\n".join(lines)
+async def build_exchange_block_async(
+    local_currency: str,
+    local_label: str,
+    foreign_currencies: Iterable[str] = ("USD", "EUR"),
+    session: Optional["aiohttp.ClientSession"] = None,
+) -> str:
+    """
+    Como build_exchange_block, pero sin bloquear el event loop: se puede lanzar con
+    asyncio.gather junto a otras secciones del informe (meteo, vuelos...).
+    """
+    foreign_currencies = list(foreign_currencies)
+    try:
+        rates = await get_rates_async(session, base=local_currency, symbols=foreign_currencies)
+    except Exception:
+        rates = None
+    return _format_exchange_block(local_currency, local_label, foreign_currencies, rates)
 
 
 # 🔁 COMPATIBILIDAD HACIA ATRÁS
-# Algunos módulos (exchange_header.py) siguen importando get_exchange_block.
+# Código antiguo síncrono sigue importando get_exchange_block (exchange_header.py usa la versión por país).
 # Definimos un wrapper compatible que delega en build_exchange_block.
 def get_exchange_block(
     local_currency: str = "HTG",
@@ -91,4 +221,35 @@ def get_exchange_block(
         local_currency=local_currency,
         local_label=local_label,
         foreign_currencies=foreign_currencies,
-    )
\ No newline at end of file
+    )
+
+
+async def get_exchange_block_async(
+    local_currency: str = "HTG",
+    local_label: str = "Gourde Haitiano",
+    foreign_currencies: Iterable[str] = ("USD", "EUR"),
+    session: Optional["aiohttp.ClientSession"] = None,
+) -> str:
+    """Versión asíncrona de get_exchange_block (usada por exchange_header.py)."""
+    return await build_exchange_block_async(
+        local_currency=local_currency,
+        local_label=local_label,
+        foreign_currencies=foreign_currencies,
+        session=session,
+    )
+
+
+async def get_country_exchange_block_async(
+    country: str,
+    session: Optional["aiohttp.ClientSession"] = None,
+) -> Optional[str]:
+    """
+    Bloque Exchange de un país entre las marcas === EXCHANGE <PAIS> === / === FIN EXCHANGE ===
+    (las que busca exchange_header.py). None si el país no tiene divisa configurada.
+    """
+    cfg = COUNTRY_CURRENCIES.get(country.lower())
+    if cfg is None:
+        return None
+    currency, label = cfg
+    block = await build_exchange_block_async(currency, label, session=session)
+    return f"=== EXCHANGE {country.upper()} ===\n{block}\n=== FIN EXCHANGE ===\n\n"
@@ -1,11 +1,16 @@
 from __future__ import annotations
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
 import os
+import time
 import aiohttp
 from urllib.parse import urlencode
 
+USER_AGENT = "MIBOT3/1.0 (flights)"
+
 # ===== Modelos de dominio =====
 @dataclass
 class Flight:
@@ -71,12 +76,13 @@ class SearchParams:
 
 # ===== Proveedor base =====
 class FlightsProvider:
-    async def search(self, p: SearchParams) -> List[Itinerary]:
+    async def search(self, p: SearchParams, session: aiohttp.ClientSession) -> List[Itinerary]:
+        # `session` la aporta FlightsService: una sola conexión keep-alive para todas las búsquedas
         raise NotImplementedError
 
 # ===== Proveedor dummy (funciona sin API) =====
 class DummyProvider(FlightsProvider):
-    async def search(self, p: SearchParams) -> List[Itinerary]:
+    async def search(self, p: SearchParams, session: aiohttp.ClientSession) -> List[Itinerary]:
         # Generamos resultados deterministas básicos
         # Nota: Solo para demo; integra Amadeus/Skyscanner aquí luego.
         base_dt = datetime.fromisoformat(p.depart_date + "T08:00:00")
@@ -105,6 +111,52 @@ class DummyProvider(FlightsProvider):
             ])
         return itineraries
 
+# ===== Parsers de respuesta (módulo: no se recrean por oferta) =====
+def _iso(s: str) -> str:
+    # fromisoformat no acepta el sufijo "Z" antes de Python 3.11
+    return s[:-1] + "+00:00" if s.endswith("Z") else s
+
+def _parse_kiwi_flight(segments: List[Dict[str, Any]], price: float, currency: str) -> Optional[Flight]:
+    if not segments:
+        return None
+    first = segments[0]
+    last = segments[-1]
+    carrier = first.get("airline") or (first.get("operating_carrier") or "")
+    flight_no = f"{carrier}{first.get('flight_no', '')}"
+    return Flight(
+        carrier=carrier,
+        flight_number=flight_no.replace(carrier, ""),
+        depart_airport=first.get("flyFrom", ""),
+        arrive_airport=last.get("flyTo", ""),
+        depart_dt=datetime.fromisoformat(_iso(first.get("local_departure"))),
+        arrive_dt=datetime.fromisoformat(_iso(last.get("local_arrival"))),
+        price=price,
+        currency=currency,
+        stops=max(0, len(segments) - 1),
+    )
+
+def _parse_amadeus_bound(bound: Dict[str, Any], price: float, currency: str) -> Optional[Flight]:
+    segs = bound.get("segments", [])
+    if not segs:
+        return None
+    first = segs[0]
+    last = segs[-1]
+    dep = first.get("departure", {})
+    arr = last.get("arrival", {})
+    carrier = first.get("carrierCode", "")
+    flight_no = f"{carrier}{first.get('number', '')}"
+    return Flight(
+        carrier=carrier,
+        flight_number=flight_no.replace(carrier, ""),
+        depart_airport=dep.get("iataCode", ""),
+        arrive_airport=arr.get("iataCode", ""),
+        depart_dt=datetime.fromisoformat(_iso(dep.get("at"))),
+        arrive_dt=datetime.fromisoformat(_iso(arr.get("at"))),
+        price=price,  # Nota: en Amadeus el precio es por oferta, lo aplicamos al out_flight
+        currency=currency,
+        stops=max(0, len(segs) - 1),
+    )
+
 # ===== Proveedor real: Kiwi Tequila API =====
 class KiwiProvider(FlightsProvider):
     BASE_URL = "https://api.tequila.kiwi.com/v2/search"
@@ -113,7 +165,7 @@ class KiwiProvider(FlightsProvider):
         self.api_key = api_key
         self.currency = currency
 
-    async def search(self, p: SearchParams) -> List[Itinerary]:
+    async def search(self, p: SearchParams, session: aiohttp.ClientSession) -> List[Itinerary]:
         # Tequila usa formato dd/mm/YYYY
         def _dmy(date_str: str) -> str:
             return datetime.fromisoformat(date_str).strftime("%d/%m/%Y")
@@ -135,11 +187,10 @@ class KiwiProvider(FlightsProvider):
             })
 
         headers = {"apikey": self.api_key}
-        async with aiohttp.ClientSession(headers=headers) as session:
-            url = f"{self.BASE_URL}?{urlencode(params)}"
-            async with session.get(url, timeout=30) as r:
-                r.raise_for_status()
-                data = await r.json()
+        url = f"{self.BASE_URL}?{urlencode(params)}"
+        async with session.get(url, headers=headers, timeout=30) as r:
+            r.raise_for_status()
+            data = await r.json()
         items = []
         for it in data.get("data", []):
             # Parsers simplificados: out/in de first/last segments
@@ -147,32 +198,9 @@ class KiwiProvider(FlightsProvider):
             out_seg = [s for s in route if s.get("return") == 0]
             in_seg = [s for s in route if s.get("return") == 1]
 
-            def build_flight(segments: List[Dict[str, Any]]) -> Optional[Flight]:
-                if not segments:
-                    return None
-                first = segments[0]
-                last = segments[-1]
-                carrier = first.get("airline") or (first.get("operating_carrier") or "")
-                flight_no = f"{carrier}{first.get('flight_no', '')}"
-                depart_airport = first.get("flyFrom", "")
-                arrive_airport = last.get("flyTo", "")
-                depart_dt = datetime.fromisoformat(first.get("local_departure").replace("Z", "+00:00"))
-                arrive_dt = datetime.fromisoformat(last.get("local_arrival").replace("Z", "+00:00"))
-                stops = max(0, len(segments) - 1)
-                return Flight(
-                    carrier=carrier,
-                    flight_number=flight_no.replace(carrier, ""),
-                    depart_airport=depart_airport,
-                    arrive_airport=arrive_airport,
-                    depart_dt=depart_dt,
-                    arrive_dt=arrive_dt,
-                    price=float(it.get("price", 0.0)),
-                    currency=self.currency,
-                    stops=stops,
-                )
-
-            out_f = build_flight(out_seg)
-            in_f = build_flight(in_seg)
+            price = float(it.get("price", 0.0))
+            out_f = _parse_kiwi_flight(out_seg, price, self.currency)
+            in_f = _parse_kiwi_flight(in_seg, price, self.currency)
             if out_f is None:
                 continue
             items.append(Itinerary(out_f, in_f, booking_url=it.get("deep_link") or None))
@@ -187,38 +215,51 @@ class AmadeusProvider(FlightsProvider):
         base = "https://test.api.amadeus.com" if env != "prod" else "https://api.amadeus.com"
         self.token_url = f"{base}/v1/security/oauth2/token"
         self.search_url = f"{base}/v2/shopping/flight-offers"
+        # Token OAuth2 (válido ~30 min): se reutiliza hasta TOKEN_REFRESH_MARGIN s antes de caducar
+        self._token: Optional[str] = None
+        self._token_exp: float = 0.0
+        self._token_lock = asyncio.Lock()
+
+    TOKEN_REFRESH_MARGIN = 60
 
     async def _get_token(self, session: aiohttp.ClientSession) -> str:
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-        }
-        async with session.post(self.token_url, data=data, timeout=30) as r:
-            r.raise_for_status()
-            js = await r.json()
-            return js["access_token"]
+        if self._token and time.monotonic() < self._token_exp - self.TOKEN_REFRESH_MARGIN:
+            return self._token
+        # Con la caché fría, solo una búsqueda pide token; las concurrentes esperan y lo reutilizan
+        async with self._token_lock:
+            if self._token and time.monotonic() < self._token_exp - self.TOKEN_REFRESH_MARGIN:
+                return self._token
+            data = {
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            }
+            async with session.post(self.token_url, data=data, timeout=30) as r:
+                r.raise_for_status()
+                js = await r.json()
+            self._token = js["access_token"]
+            self._token_exp = time.monotonic() + float(js.get("expires_in", 0))
+            return self._token
 
-    async def search(self, p: SearchParams) -> List[Itinerary]:
+    async def search(self, p: SearchParams, session: aiohttp.ClientSession) -> List[Itinerary]:
         # Amadeus usa JSON POST; currency va en "currencyCode"
-        async with aiohttp.ClientSession() as session:
-            token = await self._get_token(session)
-            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-            payload: Dict[str, Any] = {
-                "currencyCode": self.currency,
-                "originLocationCode": p.origin,
-                "destinationLocationCode": p.destination,
-                "departureDate": p.depart_date,
-                "adults": 1,
-                "max": 10,
-                "nonStop": False,
-            }
-            if p.return_date:
-                payload["returnDate"] = p.return_date
+        token = await self._get_token(session)
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        payload: Dict[str, Any] = {
+            "currencyCode": self.currency,
+            "originLocationCode": p.origin,
+            "destinationLocationCode": p.destination,
+            "departureDate": p.depart_date,
+            "adults": 1,
+            "max": 10,
+            "nonStop": False,
+        }
+        if p.return_date:
+            payload["returnDate"] = p.return_date
 
-            async with session.get(self.search_url, headers=headers, params=payload, timeout=30) as r:
-                r.raise_for_status()
-                data = await r.json()
+        async with session.get(self.search_url, headers=headers, params=payload, timeout=30) as r:
+            r.raise_for_status()
+            data = await r.json()
 
         items: List[Itinerary] = []
         for offer in data.get("data", []):
@@ -226,35 +267,8 @@ class AmadeusProvider(FlightsProvider):
             price = float(offer.get("price", {}).get("grandTotal", 0.0))
             cur = offer.get("price", {}).get("currency", self.currency)
 
-            def parse_bound(bound: Dict[str, Any]) -> Optional[Flight]:
-                segs = bound.get("segments", [])
-                if not segs:
-                    return None
-                first = segs[0]
-                last = segs[-1]
-                dep = first.get("departure", {})
-                arr = last.get("arrival", {})
-                carrier = first.get("carrierCode", "")
-                flight_no = f"{carrier}{first.get('number', '')}"
-                depart_airport = dep.get("iataCode", "")
-                arrive_airport = arr.get("iataCode", "")
-                depart_dt = datetime.fromisoformat(dep.get("at").replace("Z", "+00:00"))
-                arrive_dt = datetime.fromisoformat(arr.get("at").replace("Z", "+00:00"))
-                stops = max(0, len(segs) - 1)
-                return Flight(
-                    carrier=carrier,
-                    flight_number=flight_no.replace(carrier, ""),
-                    depart_airport=depart_airport,
-                    arrive_airport=arrive_airport,
-                    depart_dt=depart_dt,
-                    arrive_dt=arrive_dt,
-                    price=price,  # Nota: en Amadeus el precio es por oferta, lo aplicamos al out_flight
-                    currency=cur,
-                    stops=stops,
-                )
-
-            out_f = parse_bound(itineraries[0]) if len(itineraries) >= 1 else None
-            in_f = parse_bound(itineraries[1]) if len(itineraries) >= 2 else None
+            out_f = _parse_amadeus_bound(itineraries[0], price, cur) if len(itineraries) >= 1 else None
+            in_f = _parse_amadeus_bound(itineraries[1], price, cur) if len(itineraries) >= 2 else None
             if out_f is None:
                 continue
             # Amadeus no da deeplink de reserva directa: generamos enlace a Skyscanner (muestra botón de reservar)
@@ -282,6 +296,11 @@ def sort_itineraries(items: List[Itinerary], preference: str) -> List[Itinerary]
     # Por defecto: económico, luego llegada final
     return sorted(items, key=lambda it: (it.total_price, it.final_arrival, it.out_flight.stops + (it.in_flight.stops if it.in_flight else 0)))
 
+# Caché LRU de búsquedas: repetir la misma consulta no vuelve a gastar créditos de la API
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = 600        # ofertas de vuelo: 10 min
+SEARCH_CACHE_EMPTY_TTL = 30   # sin resultados: reintento pronto (puede ser un fallo puntual)
+
 class FlightsService:
     def __init__(self) -> None:
         # Selecciona proveedor (futuro: Amadeus, Skyscanner, Duffel, etc.)
@@ -299,6 +318,20 @@ class FlightsService:
             "amadeus": AmadeusProvider(s.amadeus_client_id, s.amadeus_client_secret, env=s.amadeus_env, currency=s.currency) if (s.amadeus_client_id and s.amadeus_client_secret) else None,
             "dummy": DummyProvider(),
         }
+        # Sesión HTTP compartida por todos los proveedores; se crea en la primera búsqueda
+        # (dentro del event loop) y se cierra en el apagado del bot con close()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._search_cache: "OrderedDict[tuple, Tuple[float, List[Itinerary]]]" = OrderedDict()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers={"User-Agent": USER_AGENT})
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def search(self, p: SearchParams) -> List[Itinerary]:
         # Normaliza IATA
@@ -313,6 +346,21 @@ class FlightsService:
                 # Si no está disponible (p.ej. falta API key), caemos al por defecto
                 sel = prov
             prov = sel
+
+        cache_key = (p.origin, p.destination, p.depart_date, p.return_date, p.preference, type(prov).__name__)
+        now = time.monotonic()
+        hit = self._search_cache.get(cache_key)
+        if hit is not None:
+            expires, cached = hit
+            if now < expires:
+                self._search_cache.move_to_end(cache_key)
+                return list(cached)
+            del self._search_cache[cache_key]
+
         # Busca y ordena
-        results = await prov.search(p)
-        return sort_itineraries(results, p.preference)
\ No newline at end of file
+        results = sort_itineraries(await prov.search(p, self._get_session()), p.preference)
+        ttl = SEARCH_CACHE_TTL if results else SEARCH_CACHE_EMPTY_TTL
+        self._search_cache[cache_key] = (now + ttl, results)
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return list(results)
\ No newline at end of file
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import os
 import json
+import time
 from typing import List, Dict
+from urllib.parse import urlparse
 import asyncio
 
 try:
@@ -11,6 +13,37 @@ try:
 except ImportError:
     OpenAI = None  # Se controlará en tiempo de ejecución
 
+# Todos los incidentes del día van en UNA sola llamada; este tope por categoría
+# mantiene el prompt dentro del contexto del modelo.
+SICU_AI_MAX_ROWS_PER_CAT = int(os.getenv("SICU_AI_MAX_ROWS_PER_CAT", "30"))
+
+
+# Instrucciones fijas del informe, SIEMPRE al principio y sin datos variables.
+# OpenAI solo cachea prefijos idénticos de >=1024 tokens; este prompt ronda los 250,
+# así que hoy no hay caché (_log_cache_usage mostrará cache=0). El orden se mantiene
+# para que la caché se aplique sola si las instrucciones crecen por encima del umbral.
+SICU_SYSTEM_PROMPT = (
+    "Eres un analista de seguridad de Naciones Unidas especializado en SRM/SICU. "
+    "Vas a recibir un resumen de incidentes ya clasificados por categoría para un día operativo. "
+    "Tu tarea es redactar un INFORME ANALÍTICO en ESPAÑOL, siguiendo esta estructura:\n\n"
+    "1. RESUMEN EJECUTIVO (4–7 puntos numerados, muy sintéticos y operativos).\n"
+    "3. MAPA DE FOCOS Y TENDENCIAS (por zonas/ciudades, actores, evolución, riesgos clave).\n"
+    "5. SITUACIÓN MISIÓN ONU / AUTORIDADES / FUERZA MULTINACIONAL (indica si hay cambios, restricciones de movimiento, amenazas específicas, narrativa pública, etc.).\n"
+    "6. RECOMENDACIONES OPERATIVAS (3–7 recomendaciones concretas para seguridad, movilidad y protección del personal ONU/INGOs).\n\n"
+    "No repitas toda la lista de incidentes: sintetiza y prioriza amenazas, riesgos y recomendaciones.\n\n"
+    "En el mensaje del usuario tienes los incidentes SICU (ya agregados y deduplicados) del país/área "
+    "y día operativo indicados. Úsalos como base para tu análisis."
+)
+
+
+def _source_domain(url: str) -> str:
+    """Solo el dominio de la fuente: la URL completa gasta tokens sin aportar al análisis."""
+    try:
+        netloc = urlparse(url.strip()).netloc.lower()
+    except Exception:
+        return ""
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
 
 def _build_sicu_prompt(country: str, day: str, incidents: List[Dict[str, str]]) -> str:
     """
@@ -25,22 +58,62 @@ def _build_sicu_prompt(country: str, day: str, incidents: List[Dict[str, str]])
     lines.append(f"País/Área SRM: {country}")
     lines.append(f"Día operativo: {day}")
     lines.append("")
-    lines.append("RESUMEN DE INCIDENTES POR CATEGORÍA (datos brutos para tu razonamiento):")
+    lines.append("RESUMEN DE INCIDENTES POR CATEGORÍA (datos brutos para tu razonamiento).")
+    lines.append("Formato compacto: hora|localización|descripción|fuente (fecha solo si difiere del día operativo).")
 
     for cat, rows in by_cat.items():
         lines.append(f"\n=== {cat.upper()} ({len(rows)} incidentes) ===")
-        for r in rows[:30]:  # limita para no pasarse de tokens
-            loc = r.get("localizacion") or "Localización no especificada"
-            fh = f"{r.get('fecha','')} {r.get('hora','')}".strip()
-            desc = (r.get("descripcion") or "").strip().replace("\n", " ")
-            fuente = (r.get("fuente_URL") or "")[:200]
-            lines.append(f"- [{fh}] {loc}: {desc}")
-            if fuente:
-                lines.append(f"  Fuente: {fuente}")
+        for r in rows[:SICU_AI_MAX_ROWS_PER_CAT]:  # limita para no pasarse de tokens
+            loc = r.get("localizacion") or "?"
+            fecha = r.get("fecha") or ""
+            fh = r.get("hora") or ""
+            if fecha and fecha != day:
+                fh = f"{fecha} {fh}".strip()
+            desc = " ".join((r.get("descripcion") or "").split())
+            lines.append(f"{fh}|{loc}|{desc}|{_source_domain(r.get('fuente_URL') or '')}")
 
     return "\n".join(lines)
 
 
+def _log_cache_usage(resp) -> None:
+    """Traza tokens de entrada y cuántos vinieron de la caché de prompts."""
+    try:
+        usage = resp.usage
+        details = getattr(usage, "input_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        print(f"[sicu_ai] tokens entrada={usage.input_tokens} (cache={cached})")
+    except Exception:
+        pass
+
+
+def _openai_unavailable() -> str | None:
+    """Mensaje de error si falta la librería o la API key; None si se puede llamar."""
+    if OpenAI is None:
+        return (
+            "❌ No se encontró la librería 'openai'. Instálala en el entorno actual:\n"
+            "    python -m pip install openai\n"
+        )
+    if not os.getenv("OPENAI_API_KEY"):
+        return (
+            "❌ No hay OPENAI_API_KEY en el entorno.\n"
+            "Añade a tu .env o exporta en la shell, por ejemplo:\n"
+            "    export OPENAI_API_KEY='sk-...'\n"
+        )
+    return None
+
+
+def _sicu_request_body(country: str, day: str, incidents: List[Dict[str, str]], model: str) -> dict:
+    # Prefijo estático primero; lo variable, al final (ver SICU_SYSTEM_PROMPT sobre la caché).
+    return {
+        "model": model,
+        "input": [
+            {"role": "system", "content": SICU_SYSTEM_PROMPT},
+            {"role": "user", "content": _build_sicu_prompt(country, day, incidents)},
+        ],
+        "max_output_tokens": 1200,
+    }
+
+
 async def generate_sicu_analysis(
     country: str,
     day: str,
@@ -52,50 +125,17 @@ async def generate_sicu_analysis(
     a partir de la lista de incidentes (ya deduplicados).
     Devuelve un texto listo para pegar como secciones 1, 3, 5, 6 del informe.
     """
-    if OpenAI is None:
-        return (
-            "❌ No se encontró la librería 'openai'. Instálala en el entorno actual:\n"
-            "    python -m pip install openai\n"
-        )
-
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return (
-            "❌ No hay OPENAI_API_KEY en el entorno.\n"
-            "Añade a tu .env o exporta en la shell, por ejemplo:\n"
-            "    export OPENAI_API_KEY='sk-...'\n"
-        )
+    error = _openai_unavailable()
+    if error:
+        return error
 
-    client = OpenAI(api_key=api_key)
-
-    system_message = (
-        "Eres un analista de seguridad de Naciones Unidas especializado en SRM/SICU. "
-        "Vas a recibir un resumen de incidentes ya clasificados por categoría para un día operativo. "
-        "Tu tarea es redactar un INFORME ANALÍTICO en ESPAÑOL, siguiendo esta estructura:\n\n"
-        "1. RESUMEN EJECUTIVO (4–7 puntos numerados, muy sintéticos y operativos).\n"
-        "3. MAPA DE FOCOS Y TENDENCIAS (por zonas/ciudades, actores, evolución, riesgos clave).\n"
-        "5. SITUACIÓN MISIÓN ONU / AUTORIDADES / FUERZA MULTINACIONAL (indica si hay cambios, restricciones de movimiento, amenazas específicas, narrativa pública, etc.).\n"
-        "6. RECOMENDACIONES OPERATIVAS (3–7 recomendaciones concretas para seguridad, movilidad y protección del personal ONU/INGOs).\n\n"
-        "No repitas toda la lista de incidentes: sintetiza y prioriza amenazas, riesgos y recomendaciones."
-    )
-
-    user_message = (
-        f"País/Área: {country}, día operativo {day}.\n\n"
-        "A continuación tienes los incidentes SICU (ya agregados y deduplicados). "
-        "Úsalos como base para tu análisis:\n\n"
-        f"{_build_sicu_prompt(country, day, incidents)}"
-    )
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    body = _sicu_request_body(country, day, incidents, model)
 
     def _call_api() -> str:
         # Usamos la API de respuestas (OpenAI SDK 1.x)
-        resp = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message},
-            ],
-            max_output_tokens=1200,
-        )
+        resp = client.responses.create(**body)
+        _log_cache_usage(resp)
         # Extraer el texto principal (primer bloque)
         # Ver docs de OpenAI Python 1.x para Responses API
         chunks = []
@@ -103,17 +143,119 @@ async def generate_sicu_analysis(
             for content_part in getattr(item, "content", []):
                 if getattr(content_part, "type", None) == "output_text":
                     chunks.append(content_part.text)
-        if not chunks:
-            # fallback por si el formato cambia
+        text = "\n".join(chunks).strip()
+        if not text:
+            # Formato inesperado: se traza la respuesta, pero se devuelve como error (❌)
+            # para que no acabe en la caché IA como si fuera el informe
             try:
-                return json.dumps(resp.to_dict(), ensure_ascii=False)
+                print(f"[sicu_ai] respuesta sin output_text: {json.dumps(resp.to_dict(), ensure_ascii=False)[:2000]}")
             except Exception:
-                return "⚠️ No se pudo extraer el texto del modelo."
-        return "\n".join(chunks).strip()
+                pass
+            return "❌ No se pudo extraer el texto del modelo."
+        return text
 
     try:
         text = await asyncio.to_thread(_call_api)
     except Exception as e:
         return f"❌ Error llamando a la API de OpenAI: {e}"
 
-    return text
\ No newline at end of file
+    return text
+
+
+# Batch API: mitad de precio a cambio de latencia (hasta 24h). Solo para informes programados.
+# El batch se envía y se recoge en ejecuciones posteriores (sin bloquear el JobQueue durante horas);
+# pasado SICU_BATCH_TIMEOUT_S sin terminar se cancela.
+SICU_BATCH_POLL_S = int(os.getenv("SICU_BATCH_POLL_S", "300"))
+SICU_BATCH_TIMEOUT_S = int(os.getenv("SICU_BATCH_TIMEOUT_S", str(24 * 3600)))
+_BATCH_FINAL = ("completed", "failed", "expired", "cancelled")
+
+
+def _batch_output_text(line: dict) -> str:
+    """Texto de una línea del fichero de salida del batch (o mensaje ❌)."""
+    resp = line.get("response") or {}
+    if line.get("error") or resp.get("status_code") != 200:
+        return f"❌ Error en el batch de OpenAI: {line.get('error') or resp.get('status_code')}"
+    chunks = []
+    for item in (resp.get("body") or {}).get("output") or []:
+        for part in item.get("content") or []:
+            if part.get("type") == "output_text":
+                chunks.append(part.get("text") or "")
+    return "\n".join(chunks).strip() or "❌ No se pudo extraer el texto del modelo."
+
+
+async def submit_sicu_batch(
+    jobs: List[Dict],
+    model: str = "gpt-4.1-mini",
+) -> tuple[str | None, str]:
+    """
+    Versión Batch API de generate_sicu_analysis para informes NO interactivos.
+    jobs: [{"country": str, "day": str, "incidents": [...]}, ...]
+    Envía el batch sin esperar a que termine. Devuelve (batch_id, "") o (None, motivo ❌).
+    Los resultados se recogen después con collect_sicu_batch.
+    """
+    error = _openai_unavailable()
+    if error:
+        return None, error
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    payload = "".join(
+        json.dumps({
+            "custom_id": f"sicu-{i}",
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": _sicu_request_body(j["country"], j["day"], j["incidents"], model),
+        }, ensure_ascii=False) + "\n"
+        for i, j in enumerate(jobs)
+    ).encode("utf-8")
+
+    try:
+        upload = await asyncio.to_thread(
+            client.files.create, file=("sicu_batch.jsonl", payload), purpose="batch"
+        )
+        batch = await asyncio.to_thread(
+            client.batches.create,
+            input_file_id=upload.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+    except Exception as e:
+        return None, f"❌ Error llamando a la Batch API de OpenAI: {e}"
+    return batch.id, ""
+
+
+async def collect_sicu_batch(batch_id: str, n_jobs: int, submitted_at: float) -> List[str] | None:
+    """
+    Consulta una vez el estado del batch. Devuelve None si sigue en curso; si no,
+    un texto por job en el orden del envío (mensaje ❌ para los que fallaron).
+    Si lleva más de SICU_BATCH_TIMEOUT_S sin terminar, se cancela.
+    """
+    error = _openai_unavailable()
+    if error:
+        return None
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    try:
+        batch = await asyncio.to_thread(client.batches.retrieve, batch_id)
+        if batch.status not in _BATCH_FINAL:
+            if time.time() - submitted_at < SICU_BATCH_TIMEOUT_S:
+                return None
+            await asyncio.to_thread(client.batches.cancel, batch_id)
+            return [f"❌ El batch {batch_id} no terminó en {SICU_BATCH_TIMEOUT_S}s; cancelado"] * n_jobs
+        if batch.status != "completed" or not batch.output_file_id:
+            return [f"❌ Batch {batch_id} terminó con estado {batch.status}"] * n_jobs
+        content = await asyncio.to_thread(client.files.content, batch.output_file_id)
+    except Exception as e:
+        print(f"[sicu_ai] error consultando batch {batch_id}: {e!r}")
+        return None  # se reintenta en la siguiente consulta
+
+    by_id: Dict[str, str] = {}
+    for raw in content.text.splitlines():
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except ValueError as e:
+            print(f"[sicu_ai] línea inválida en la salida del batch {batch_id}: {e!r}")
+            continue
+        by_id[line.get("custom_id", "")] = _batch_output_text(line)
+    return [by_id.get(f"sicu-{i}", "❌ Job ausente en la salida del batch") for i in range(n_jobs)]
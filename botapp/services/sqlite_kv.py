@@ -0,0 +1,22 @@
+# botapp/services/sqlite_kv.py
+from __future__ import annotations
+import sqlite3
+from pathlib import Path
+
+
+def connect_kv(path: Path) -> sqlite3.Connection:
+    """Conexión SQLite de larga vida para los almacenes clave→valor del collector.
+
+    - journal_mode=WAL: lectores y escritor no se bloquean entre sí.
+    - synchronous=NORMAL: sin fsync extra por transacción (durabilidad razonable con WAL).
+    - check_same_thread=False: la usan el bucle del bot y el hook de atexit.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA busy_timeout=5000;")  # ms
+    except Exception:
+        pass  # pragma best-effort
+    return conn
@@ -59,6 +59,18 @@ class Store:
             fh.write(f"--- {title} @ {dt} ---\n{text.strip()}\n\n")
         return f
 
+    def append_entries(self, country: str, day: str, entries: Iterable[tuple[str, str, str]]) -> Path:
+        """
+        Igual que append_entry pero para varias entradas (title, dt, text):
+        abre el TXT una sola vez y escribe todo el bloque de golpe.
+        """
+        f = self._country_dir(country) / f"{day}.txt"
+        chunk = "".join(f"--- {title} @ {dt} ---\n{text.strip()}\n\n" for title, dt, text in entries)
+        if chunk:
+            with f.open("a", encoding="utf-8") as fh:
+                fh.write(chunk)
+        return f
+
     def read_recent(self, country: str, days_files: Iterable[str]) -> str:
         buf = []
         for day in days_files:
@@ -93,5 +105,6 @@ class Store:
         entries.sort(key=lambda e: (e["dt"], e["title"].lower()))
 
         new_text = prefix + "".join(e["content"] for e in entries)
-        file_path.write_text(new_text, encoding="utf-8")
+        if new_text != text:  # ya ordenado: no se reescribe (conserva el mtime)
+            file_path.write_text(new_text, encoding="utf-8")
         return file_path
\ No newline at end of file
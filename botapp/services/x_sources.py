@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
 from typing import Dict, List
 
@@ -27,7 +28,47 @@ def load_x_sources() -> Dict[str, List[str]]:
         return json.load(f)
 
 
+def _clean_sources(raw: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Handles sin '@' ni vacíos, por país en minúsculas: se calcula una vez al cargar."""
+    out: Dict[str, List[str]] = {}
+    for country, handles in raw.items():
+        clean = (h.strip().lstrip("@").strip() for h in handles or [])
+        out[country.lower()] = [h for h in clean if h]
+    return out
+
+
+def _mtime_ns() -> int:
+    try:
+        return X_SOURCES_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
 X_SOURCES: Dict[str, List[str]] = load_x_sources()
+X_SOURCES_CLEAN: Dict[str, List[str]] = _clean_sources(X_SOURCES)
+
+# Recarga en caliente: como mucho un stat() cada X_SOURCES_TTL segundos
+# y solo se vuelve a parsear el JSON si cambió su mtime.
+X_SOURCES_TTL = 300
+_loaded_mtime_ns = _mtime_ns()
+_checked_at = time.monotonic()
+
+
+def _refresh() -> None:
+    global X_SOURCES, X_SOURCES_CLEAN, _loaded_mtime_ns, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < X_SOURCES_TTL:
+        return
+    _checked_at = now
+    mtime = _mtime_ns()
+    if mtime == _loaded_mtime_ns:
+        return
+    try:
+        raw = load_x_sources()
+    except Exception as e:
+        print(f"[x_sources] x_sources.json inválido, se mantiene la versión anterior: {e!r}")
+        return
+    X_SOURCES, X_SOURCES_CLEAN, _loaded_mtime_ns = raw, _clean_sources(raw), mtime
 
 
 def get_x_sources(country: str) -> List[str]:
@@ -36,5 +77,16 @@ def get_x_sources(country: str) -> List[str]:
 
     Ejemplo: get_x_sources("haiti") -> ["@HaitiLibre", "@machannzen", ...]
     """
+    _refresh()
     country = country.lower()
-    return X_SOURCES.get(country, [])
\ No newline at end of file
+    return X_SOURCES.get(country, [])
+
+
+def get_x_sources_clean(country: str) -> List[str]:
+    """
+    Como get_x_sources, pero con los handles ya limpios (sin '@', sin vacíos).
+
+    Ejemplo: get_x_sources_clean("haiti") -> ["HaitiLibre", "machannzen", ...]
+    """
+    _refresh()
+    return X_SOURCES_CLEAN.get(country.lower(), [])
@@ -3,7 +3,7 @@ from pathlib import Path
 import re
 from ..config import get_settings
 from ..utils.time import today_str
-from ..services.exchange import get_exchange_block
+from ..services.exchange import get_country_exchange_block_async
 
 SET = get_settings()
 
@@ -27,7 +27,10 @@ async def prepend_exchange_header(country: str) -> Path:
     content = f.read_text(encoding="utf-8")
     if _has_exchange_block(content):
         return f
-    block = await get_exchange_block(country)
+    block = await get_country_exchange_block_async(country)
+    if block is None:
+        # País sin divisa configurada (p.ej. campello): no se añade cabecera
+        return f
     updated = (block + content) if content else block
     f.write_text(updated, encoding="utf-8")
     return f
\ No newline at end of file
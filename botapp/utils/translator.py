@@ -91,7 +91,7 @@ def _save_es_cache() -> None:
     try:
         ES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
         ES_CACHE_PATH.write_text(
-            json.dumps(_ES_CACHE, ensure_ascii=False, indent=2),
+            json.dumps(_ES_CACHE, ensure_ascii=False, separators=(",", ":")),  # compacto: solo la lee el bot
             encoding="utf-8",
         )
     except Exception as e: